@@ -0,0 +1,11 @@
+# Copyright (c) 2020 SMHI, Swedish Meteorological and Hydrological Institute.
+# License: MIT License (see LICENSE.txt or http://opensource.org/licenses/mit).
+"""
+Created on 2026-10-18 20:40
+
+@author: johannes
+
+Benchmarks for airspeed velocity (asv), run with:
+    $ asv run
+    $ asv compare <commit> <commit>
+"""
@@ -0,0 +1,107 @@
+# Copyright (c) 2020 SMHI, Swedish Meteorological and Hydrological Institute.
+# License: MIT License (see LICENSE.txt or http://opensource.org/licenses/mit).
+"""
+Created on 2026-10-18 22:05
+
+@author: johannes
+"""
+import pandas as pd
+from sirena.core.calculator import Statistics
+from sirena.core.panel import Panel
+from sirena.offline.fixtures import get_dataframes, get_station_names
+
+
+class CalculateStats:
+    """Regression and annual mean water level for one station."""
+
+    params = [100, 300]
+    param_names = ['nr_years']
+    parameter = 'RH2000_Year.Mean'
+
+    def setup(self, nr_years):
+        """Set up synthetic data."""
+        self.df = get_dataframes(1, nr_years)['STATION 0']
+
+    def calculate(self, lean=False):
+        """Return calculator with statistics for the synthetic station."""
+        statistics = Statistics(calculation_year=2021, lean=lean)
+        statistics.append_new_station(
+            name='SYNTHETIC',
+            data=self.df,
+            parameter=self.parameter,
+            station_attr={'ref_value_2000': 10.}
+        )
+        return statistics['SYNTHETIC']
+
+    def time_calculate_stats(self, nr_years):
+        """Calculate without the lazy summaries."""
+        self.calculate()
+
+    def time_calculate_stats_with_summaries(self, nr_years):
+        """Calculate and access the summaries (the former eager behaviour)."""
+        calculator = self.calculate()
+        calculator.regression_summary
+        calculator.summary
+
+    def time_calculate_stats_lean(self, nr_years):
+        """Calculate in lean (report-only) mode."""
+        self.calculate(lean=True)
+
+
+class StatisticsScaling:
+    """Statistics for many stations, serial and batched."""
+
+    params = [[10, 100], [100, 300]]
+    param_names = ['nr_stations', 'nr_years']
+    parameter = 'RH2000_Year.Mean'
+    timeout = 300
+
+    def setup(self, nr_stations, nr_years):
+        """Set up synthetic data."""
+        dfs = get_dataframes(nr_stations, nr_years)
+        self.stations = {
+            name: {'data': dfs[name], 'station_attr': {'ref_value_2000': 10.}}
+            for name in get_station_names(nr_stations)
+        }
+
+    def time_serial(self, nr_stations, nr_years):
+        """Calculate station by station."""
+        statistics = Statistics(calculation_year=2021)
+        for name, item in self.stations.items():
+            statistics.append_new_station(name=name, parameter=self.parameter, **item)
+
+    def time_batched(self, nr_stations, nr_years):
+        """Calculate all stations with one batched regression."""
+        Statistics(calculation_year=2021, lean=True).append_new_stations(
+            self.stations, self.parameter)
+
+
+class CrossStation:
+    """Operations over all stations, from the panel store and from the frames."""
+
+    params = [[10, 100], [100, 300]]
+    param_names = ['nr_stations', 'nr_years']
+    parameter = 'RH2000_Year.Mean'
+
+    def setup(self, nr_stations, nr_years):
+        """Set up synthetic data."""
+        self.dfs = get_dataframes(nr_stations, nr_years)
+        self.panel = self.dfs.panel
+
+    def time_build_panel(self, nr_stations, nr_years):
+        """Build the panel from the frames."""
+        Panel.from_frames(self.dfs)
+
+    def time_time_mean_panel(self, nr_stations, nr_years):
+        """All-station mean per timestamp from the panel."""
+        self.panel.time_mean(self.parameter)
+
+    def time_time_mean_frames(self, nr_stations, nr_years):
+        """All-station mean per timestamp by concatenating the frames."""
+        pd.concat(
+            [df[['timestamp', self.parameter]] for df in self.dfs.values()]
+        ).groupby('timestamp')[self.parameter].mean()
+
+    def time_regression_panel(self, nr_stations, nr_years):
+        """Batched regression of all stations from the panel."""
+        self.panel.regression(self.parameter).get_results()
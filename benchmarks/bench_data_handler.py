@@ -0,0 +1,125 @@
+# Copyright (c) 2020 SMHI, Swedish Meteorological and Hydrological Institute.
+# License: MIT License (see LICENSE.txt or http://opensource.org/licenses/mit).
+"""
+Created on 2026-10-18 20:40
+
+@author: johannes
+"""
+import datetime as dt
+import numpy as np
+import pandas as pd
+from sirena.core.alignment import align_channels
+from sirena.core.data_handler import Frame
+from sirena.offline.fixtures import get_series
+
+
+def get_wiski_frame(nr_values, parameter='RH2000_Hour.Mean', timestamp_dtype='str'):
+    """Return frame shaped like a parsed Wiski response.
+
+    All columns are strings for the minidom parser, and int64, float64 and
+    int16 for iterparse.
+    """
+    timestamps, values, quality = get_series(nr_values, freq='h')
+    df = pd.DataFrame({
+        'timestamp': timestamps,
+        parameter: values,
+        'Q_' + parameter: quality.astype(np.int16),
+    })
+    if timestamp_dtype == 'str':
+        df = df.astype(str)
+    return df
+
+
+class ConvertFormats:
+    """Timestamp conversion in Frame.convert_formats."""
+
+    params = [[100000, 1000000], ['str', 'int64']]
+    param_names = ['nr_values', 'timestamp_dtype']
+
+    def setup(self, nr_values, timestamp_dtype):
+        """Set up synthetic data."""
+        self.df = get_wiski_frame(nr_values, timestamp_dtype=timestamp_dtype)
+
+    def time_convert_formats(self, nr_values, timestamp_dtype):
+        """Conversion of timestamps, data and flag columns."""
+        Frame(self.df.copy()).convert_formats()
+
+    def time_convert_timestamps(self, nr_values, timestamp_dtype):
+        """Vectorized conversion of timestamps."""
+        pd.to_datetime(pd.to_numeric(self.df['timestamp']).astype(np.int64),
+                       unit='ms', origin=Frame.dt_start)
+
+    def time_convert_timestamps_rowwise(self, nr_values, timestamp_dtype):
+        """Convert timestamps row-wise, as done before (reference)."""
+        self.df['timestamp'].apply(
+            lambda x: dt.datetime(1970, 1, 1) + dt.timedelta(milliseconds=float(x))
+        )
+
+
+class ExcludeFlaggedData:
+    """Quality flag masking in Frame.exclude_flagged_data."""
+
+    params = [[100000, 1000000], [1, 3]]
+    param_names = ['nr_values', 'nr_channels']
+
+    def setup(self, nr_values, nr_channels):
+        """Set up synthetic data."""
+        df = get_wiski_frame(nr_values, timestamp_dtype='int64')
+        for i in range(1, nr_channels):
+            df['RH2000_Channel{}'.format(i)] = df['RH2000_Hour.Mean']
+            df['Q_RH2000_Channel{}'.format(i)] = df['Q_RH2000_Hour.Mean']
+        self.frame = Frame(df)
+        self.frame.convert_formats()
+
+    def time_exclude_flagged_data(self, nr_values, nr_channels):
+        """Mask flagged values of all data columns."""
+        self.frame.copy().exclude_flagged_data()
+
+
+class CompactStorage:
+    """Memory of converted frames, with and without compact storage."""
+
+    params = [100000]
+    param_names = ['nr_values']
+
+    def setup(self, nr_values):
+        """Set up synthetic data."""
+        self.frame = Frame(get_wiski_frame(nr_values, timestamp_dtype='int64'))
+        self.frame.convert_formats()
+
+    def track_memory_usage(self, nr_values):
+        """Return bytes of the converted frame."""
+        return int(self.frame.memory_usage(deep=True).sum())
+
+    def track_memory_usage_compact(self, nr_values):
+        """Return bytes of the compact frame."""
+        frame = self.frame.copy()
+        frame.compact()
+        return int(frame.memory_usage(deep=True).sum())
+
+    track_memory_usage.unit = 'bytes'
+    track_memory_usage_compact.unit = 'bytes'
+
+
+class AlignChannels:
+    """Alignment of the channel frames of a station on timestamp."""
+
+    params = [[100000, 1000000], ['inner', 'outer']]
+    param_names = ['nr_values', 'how']
+
+    def setup(self, nr_values, how):
+        """Set up synthetic channels, with some timestamps missing in two of them."""
+        self.frames = []
+        for i, channel in enumerate(('Hour.Mean', 'Hour.Max', 'Hour.Min')):
+            df = get_wiski_frame(nr_values, parameter='RH2000_' + channel, timestamp_dtype='int64')
+            self.frames.append(df.iloc[::i + 1] if i else df)
+
+    def time_align_channels(self, nr_values, how):
+        """Align all channels in one pass."""
+        align_channels(self.frames, how=how)
+
+    def time_chained_merge(self, nr_values, how):
+        """Merge the channels one by one (the former approach)."""
+        df = self.frames[0]
+        for df_channel in self.frames[1:]:
+            df = pd.merge(df, df_channel, how=how, on='timestamp')
@@ -0,0 +1,27 @@
+# Copyright (c) 2020 SMHI, Swedish Meteorological and Hydrological Institute.
+# License: MIT License (see LICENSE.txt or http://opensource.org/licenses/mit).
+"""
+Created on 2026-10-19 00:40
+
+@author: johannes
+"""
+
+
+class ImportTime:
+    """Import time of sirena modules, each measured in a fresh interpreter."""
+
+    def timeraw_import_sirena(self):
+        """Import the package."""
+        return "import sirena"
+
+    def timeraw_import_session(self):
+        """Import the session (without statsmodels, sklearn, bokeh, pyproj)."""
+        return "import sirena.session"
+
+    def timeraw_import_calculator(self):
+        """Import the calculator."""
+        return "import sirena.core.calculator"
+
+    def timeraw_import_plotting(self):
+        """Import the bokeh GUI."""
+        return "import sirena.plotting.widgets"
@@ -0,0 +1,122 @@
+# Copyright (c) 2020 SMHI, Swedish Meteorological and Hydrological Institute.
+# License: MIT License (see LICENSE.txt or http://opensource.org/licenses/mit).
+"""
+Created on 2026-10-18 23:10
+
+@author: johannes
+"""
+import os
+import tempfile
+from sirena.core.calculator import Statistics
+from sirena.core.station import MultiStation
+from sirena.offline.fixtures import get_dataframes, get_samsa_data
+
+
+def get_stations_and_statistics(nr_stations, nr_years, parameter='RH2000_Year.Mean'):
+    """Return synthetic MultiStation and Statistics."""
+    stations = MultiStation()
+    stations.read_from_samsa_elements(get_samsa_data(nr_stations)['data'])
+    dfs = get_dataframes(nr_stations, nr_years)
+    statistics = Statistics(calculation_year=2021)
+    for name, station in stations.items():
+        station.update_attributes(absolute_landlift=5., k_value=0.4)
+        statistics.append_new_station(
+            name=name,
+            data=dfs[name],
+            parameter=parameter,
+            station_attr={'ref_value_2000': station.ref_value_2000}
+        )
+    return stations, statistics
+
+
+class PlotConstruction:
+    """Construction of the bokeh GUI (sources, map, widgets)."""
+
+    params = [[10, 100], [100, 300]]
+    param_names = ['nr_stations', 'nr_years']
+    timeout = 300
+
+    def setup(self, nr_stations, nr_years):
+        """Set up synthetic stations and statistics."""
+        self.stations, self.statistics = get_stations_and_statistics(nr_stations, nr_years)
+        self.directory = tempfile.TemporaryDirectory()
+        self.output_filename = os.path.join(self.directory.name, 'SMISK_VIZ.html')
+
+    def teardown(self, nr_stations, nr_years):
+        """Remove output files."""
+        self.directory.cleanup()
+
+    def time_plot(self, nr_stations, nr_years):
+        """Construct Plot."""
+        from sirena.plotting.widgets import Plot
+        Plot(
+            stations=self.stations,
+            statistics=self.statistics,
+            output_filename=self.output_filename
+        )
+
+
+class PlotHTML:
+    """Size and generation time of the static html, per GUI data mode."""
+
+    params = [[10, 100], ['lists', 'binary']]
+    param_names = ['nr_stations', 'data_mode']
+    timeout = 300
+
+    def setup(self, nr_stations, data_mode):
+        """Set up synthetic stations and statistics."""
+        self.stations, self.statistics = get_stations_and_statistics(nr_stations, 300)
+        self.directory = tempfile.TemporaryDirectory()
+        self.output_filename = os.path.join(self.directory.name, 'SMISK_VIZ.html')
+
+    def teardown(self, nr_stations, data_mode):
+        """Remove output files."""
+        self.directory.cleanup()
+
+    def get_html(self, data_mode):
+        """Return standalone html of a new plot."""
+        from bokeh.embed import file_html
+        from bokeh.resources import CDN
+        from sirena.plotting.widgets import Plot
+        plot = Plot(
+            stations=self.stations,
+            statistics=self.statistics,
+            output_filename=self.output_filename,
+            data_mode=data_mode
+        )
+        return file_html(plot.get_layout(), CDN)
+
+    def time_plot_to_html(self, nr_stations, data_mode):
+        """Construct plot and serialize it to html."""
+        self.get_html(data_mode)
+
+    def track_html_size(self, nr_stations, data_mode):
+        """Return size of the html."""
+        return len(self.get_html(data_mode).encode('utf8'))
+
+    track_html_size.unit = 'bytes'
+
+
+class ProjectStations:
+    """Projection of station positions to EPSG:3857."""
+
+    params = [10, 1000]
+    param_names = ['nr_stations']
+
+    def setup(self, nr_stations):
+        """Set up synthetic stations."""
+        self.stations = MultiStation()
+        self.stations.read_from_samsa_elements(get_samsa_data(nr_stations)['data'])
+
+    def time_convert_projection(self, nr_stations):
+        """Project all positions (cached transformer, no station cache)."""
+        from sirena.utils import convert_projection
+        convert_projection(
+            [s.latitude for s in self.stations.values()],
+            [s.longitude for s in self.stations.values()]
+        )
+
+    def time_projected_coordinates_cached(self, nr_stations):
+        """Project all positions again, served from the station cache."""
+        self.stations.get_projected_coordinates()
+        self.stations.get_projected_coordinates()
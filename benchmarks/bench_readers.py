@@ -0,0 +1,47 @@
+# Copyright (c) 2020 SMHI, Swedish Meteorological and Hydrological Institute.
+# License: MIT License (see LICENSE.txt or http://opensource.org/licenses/mit).
+"""
+Created on 2026-10-18 22:55
+
+@author: johannes
+"""
+import io
+from sirena.core.station import MultiStation
+from sirena.offline.fixtures import get_samsa_data, get_wiski_xml
+from sirena.readers.wiski import Wiski
+
+
+class ParseWiski:
+    """Parsing of Wiski timeseriesValueList responses."""
+
+    params = [[1000, 100000], ['minidom', 'iterparse']]
+    param_names = ['nr_values', 'parser']
+
+    def setup(self, nr_values, parser):
+        """Set up synthetic xml."""
+        self.xml = get_wiski_xml(nr_values)
+        self.reader = Wiski()
+        self.reader.update_attributes(parameter='RH2000', channel='Day.Mean', parser=parser)
+
+    def time_get_data(self, nr_values, parser):
+        """Parse xml into a dataframe."""
+        self.reader.get_data(as_dataframe=True, source=io.BytesIO(self.xml))
+
+    def peakmem_get_data(self, nr_values, parser):
+        """Parse xml into a dataframe."""
+        self.reader.get_data(as_dataframe=True, source=io.BytesIO(self.xml))
+
+
+class ReadSAMSA:
+    """Station metadata from SAMSA."""
+
+    params = [40, 1000]
+    param_names = ['nr_stations']
+
+    def setup(self, nr_stations):
+        """Set up synthetic json data."""
+        self.data = get_samsa_data(nr_stations)['data']
+
+    def time_read_from_samsa_elements(self, nr_stations):
+        """Build MultiStation from SAMSA elements."""
+        MultiStation().read_from_samsa_elements(self.data)
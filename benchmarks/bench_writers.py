@@ -0,0 +1,55 @@
+# Copyright (c) 2020 SMHI, Swedish Meteorological and Hydrological Institute.
+# License: MIT License (see LICENSE.txt or http://opensource.org/licenses/mit).
+"""
+Created on 2026-10-18 23:15
+
+@author: johannes
+"""
+import os
+import tempfile
+from sirena.offline.fixtures import get_station_names
+from sirena.writers.excel_template import ExcelTemplateWriter
+
+BASE_DIRECTORY = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+
+class ExcelTemplate:
+    """Export of station data to the excel template (mwreg)."""
+
+    params = [40, 200]
+    param_names = ['nr_stations']
+
+    def setup(self, nr_stations):
+        """Set up synthetic template data."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.data = {
+            name: {
+                'template_number': i,
+                'template_name': name,
+                'template_longitude': "12° 30' 15''",
+                'template_latitude': "57° 10' 45''",
+                'annual_mean': 12.3,
+                'apparent_land_uplift': 0.4,
+            } for i, name in enumerate(get_station_names(nr_stations))
+        }
+        self.kwargs = {
+            'template_path': os.path.join(BASE_DIRECTORY, 'sirena', 'etc', 'templates', 'mwreg.xlsx'),
+            'export_path': os.path.join(self.directory.name, 'mwreg_sirena.xlsx'),
+            'start_row_index': 9,
+            'cell_mapping': {
+                'template_number': "A%s",
+                'template_name': "B%s",
+                'template_longitude': "C%s",
+                'template_latitude': "D%s",
+                'annual_mean': "G%s",
+                'apparent_land_uplift': "I%s",
+            },
+        }
+
+    def teardown(self, nr_stations):
+        """Remove exported files."""
+        self.directory.cleanup()
+
+    def time_write(self, nr_stations):
+        """Copy template and write data."""
+        ExcelTemplateWriter(**self.kwargs).write(self.data)
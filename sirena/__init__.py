@@ -5,10 +5,23 @@ Created on 2020-04-07 10:33
 
 @author: a002028
 """
-from sirena import core  # noqa: F401
-from sirena import plotting  # noqa: F401
-from sirena import readers  # noqa: F401
-from sirena import writers  # noqa: F401
+import importlib
+
+# subpackages are imported on first use (eg. sirena.plotting imports bokeh)
+_subpackages = ('core', 'plotting', 'readers', 'writers')
+
+
+def __getattr__(name):
+    """Import subpackage on first use."""
+    if name in _subpackages:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+def __dir__():
+    """Return attributes, including subpackages not imported yet."""
+    return sorted(list(globals()) + list(_subpackages))
+
 
 """
 TODO
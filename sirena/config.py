@@ -6,10 +6,15 @@ Created on 2020-04-07 10:28
 @author: a002028
 """
 import os
+import sys
+import copy
+import pickle
+import hashlib
 from pathlib import Path
 from sirena.readers.yaml_reader import YAMLreader
 from sirena.readers.json_reader import JSONreader
 from sirena.utils import (
+    check_path,
     generate_filepaths,
     get_subdirectories,
     get_filepaths_from_directory
@@ -74,10 +79,24 @@ class ErrorCapturing:
 
 
 class Settings:
-    """Class to hold information from etc settings files."""
+    """Class to hold information from etc settings files.
 
-    def __init__(self):
-        """Initialize."""
+    The parsed settings are stored as a snapshot (pickle) in the cache
+    folder and reused until any of the yaml files changes. Use
+    Settings.shared() to parse the settings only once per process.
+    """
+
+    snapshot_version = 1
+    _shared = None
+    _shared_key = None
+
+    def __init__(self, use_snapshot=True):
+        """Initialize.
+
+        Args:
+            use_snapshot (bool): Load settings from (and store them in) the
+                snapshot instead of parsing all yaml files.
+        """
         self.server_samsa = None
         self.server_wiski = None
         self.readers = None
@@ -86,10 +105,69 @@ class Settings:
         self.base_directory = os.path.dirname(os.path.realpath(__file__))
         self.export_path = os.path.join(self.base_directory, 'export')
         etc_path = os.path.join(self.base_directory, 'etc')
-        self._load_settings(etc_path)
-        self._add_base_dir_to_paths()
+        self.snapshot_key = self.get_snapshot_key(etc_path)
+        if not use_snapshot or not self._load_snapshot():
+            self._load_settings(etc_path)
+            self._add_base_dir_to_paths()
+            if use_snapshot:
+                self._save_snapshot()
         self._load_local_info()
 
+    @classmethod
+    def shared(cls):
+        """Return a copy of the settings parsed once per process.
+
+        Every caller gets its own (deep) copy, so changes (eg. set_reader)
+        do not affect other sessions. The settings are parsed again when
+        the yaml files (or the environment variable SIRENA_SERVER_INFO_PATH)
+        have changed.
+        """
+        base_directory = os.path.dirname(os.path.realpath(__file__))
+        key = (cls.get_snapshot_key(os.path.join(base_directory, 'etc')),
+               os.environ.get('SIRENA_SERVER_INFO_PATH'))
+        if cls._shared is None or cls._shared_key != key:
+            cls._shared = cls()
+            cls._shared_key = key
+        return copy.deepcopy(cls._shared)
+
+    @classmethod
+    def get_snapshot_key(cls, etc_path):
+        """Return key (hash) of the yaml files in etc_path (paths, mtimes and sizes)."""
+        key = hashlib.sha1(repr((cls.snapshot_version, sys.version_info[:2], etc_path)).encode('utf8'))
+        for path in sorted(generate_filepaths(etc_path, endswith='.yaml')):
+            stat = os.stat(path)
+            key.update('{}|{}|{}'.format(path, stat.st_mtime_ns, stat.st_size).encode('utf8'))
+        return key.hexdigest()
+
+    @property
+    def snapshot_path(self):
+        """Return path to the settings snapshot."""
+        return os.path.join(self.base_directory, 'cache', 'settings.pickle')
+
+    def _load_snapshot(self):
+        """Load settings from snapshot, return True if it was found and valid."""
+        try:
+            with open(self.snapshot_path, 'rb') as fd:
+                snapshot = pickle.load(fd)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return False
+        if snapshot.get('key') != self.snapshot_key:
+            return False
+        self.__dict__.update(snapshot['attributes'])
+        return True
+
+    def _save_snapshot(self):
+        """Store settings in snapshot (skipped if the cache folder is not writable)."""
+        snapshot = {'key': self.snapshot_key, 'attributes': dict(self.__dict__)}
+        tmp_path = self.snapshot_path + '.{}.tmp'.format(os.getpid())
+        try:
+            check_path(os.path.dirname(self.snapshot_path))
+            with open(tmp_path, 'wb') as fd:
+                pickle.dump(snapshot, fd, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError:
+            pass
+
     def __setattr__(self, name, value):
         """Define the setattr for object self.
 
@@ -151,7 +229,13 @@ class Settings:
                 self.base_directory).joinpath(self.settings['paths'][key])
 
     def _load_local_info(self):
-        """Load local info."""
+        """Load local info.
+
+        The path to srv.json can be overridden with the environment variable
+        SIRENA_SERVER_INFO_PATH (eg. to use sirena.offline.server).
+        """
+        if os.environ.get('SIRENA_SERVER_INFO_PATH'):
+            self.settings['paths']['server_info_path'] = os.environ['SIRENA_SERVER_INFO_PATH']
         if not os.path.exists(self.settings['paths'].get('server_info_path')):
             raise ImportError(
                 'Could not find any settings paths. You need to copy srv.json into the folder: {} '
@@ -0,0 +1,75 @@
+# Copyright (c) 2020 SMHI, Swedish Meteorological and Hydrological Institute.
+# License: MIT License (see LICENSE.txt or http://opensource.org/licenses/mit).
+"""
+Created on 2026-10-19 02:10
+
+@author: johannes
+"""
+import numpy as np
+import pandas as pd
+
+JOIN_POLICIES = ('inner', 'outer')
+
+
+def get_timestamps(df, on='timestamp'):
+    """Return timestamps (milliseconds) of df as int64 array."""
+    return np.asarray(pd.to_numeric(df[on]), dtype=np.int64)
+
+
+def is_strictly_increasing(array):
+    """Return True if array is sorted and without duplicates."""
+    return bool(np.all(array[1:] > array[:-1]))
+
+
+def align_channels(frames, how='inner', on='timestamp'):
+    """Return one frame with the columns of all channel frames of a station.
+
+    The channels are aligned in a single pass on a sorted int64 timestamp
+    index, instead of merging the frames one by one (which re-sorts and
+    copies the growing frame for every channel).
+
+    Args:
+        frames (list): DataFrames with the timestamp column "on" (epoch
+            milliseconds) and the value and flag columns of one channel.
+            Timestamps are expected to be unique within a channel, the
+            last value is used for duplicates.
+        how (str): "inner", timestamps found in all channels, or "outer",
+            timestamps found in any channel. Missing values (outer join) are
+            NaN, missing flags are parsed as -1 (see QualityFlags). Empty
+            frames (channels without data) are left out of the join.
+        on (str): Name of the timestamp column.
+    """
+    if how not in JOIN_POLICIES:
+        raise ValueError('Unknown join policy {!r}, use one of {}'.format(how, JOIN_POLICIES))
+    frames = [df for df in frames if df is not None and not df.empty and on in df]
+    if not frames:
+        return pd.DataFrame()
+
+    timestamps = [get_timestamps(df, on=on) for df in frames]
+    # with unique timestamps per channel, the count tells in how many channels
+    # each timestamp is found
+    unique_timestamps = [t if is_strictly_increasing(t) else np.unique(t) for t in timestamps]
+    index, counts = np.unique(np.concatenate(unique_timestamps), return_counts=True)
+    if how == 'inner':
+        index = index[counts == len(frames)]
+
+    columns = {on: index}
+    for df, channel_timestamps in zip(frames, timestamps):
+        positions = np.searchsorted(index, channel_timestamps)
+        found = positions < index.size
+        found[found] = index[positions[found]] == channel_timestamps[found]
+        complete = how == 'inner' or found.sum() == index.size
+
+        for column in df.columns:
+            if column == on:
+                continue
+            values = df[column].to_numpy()
+            if complete:
+                aligned = np.empty(index.size, dtype=values.dtype)
+            else:
+                dtype = np.float64 if values.dtype.kind in 'biuf' else object
+                aligned = np.full(index.size, np.nan, dtype=np.result_type(values.dtype, dtype))
+            aligned[positions[found]] = values[found]
+            columns[column] = aligned
+
+    return pd.DataFrame(columns, copy=False)
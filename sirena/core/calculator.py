@@ -7,11 +7,10 @@ Created on 2020-04-07 13:01
 """
 import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-import statsmodels.api as sm
-from statsmodels.sandbox.regression.predstd import wls_prediction_std
-from statsmodels.stats.outliers_influence import summary_table
-from sklearn.preprocessing import PolynomialFeatures
+from sirena.core.regression import BatchedOLS, pad_arrays
+from sirena.instrumentation import Instrumentation
 from sirena.utils import round_value
 
 
@@ -94,6 +93,7 @@ class OLSEquation:
 
     def __call__(self):
         """Return class calculation."""
+        import statsmodels.api as sm
         res = sm.OLS(
             self.df[self.parameter],
             self.df.loc[:, ['year', 'intercept']],
@@ -118,8 +118,10 @@ class OLSLinearRegression:
 
     def __call__(self):
         """Return class calculation."""
+        import statsmodels.api as sm
         x = self.df['year'].values
-        y = self.df[self.parameter].values
+        # Fit in double precision, also for compact (float32) frames
+        y = self.df[self.parameter].values.astype(float)
 
         x = x[:, np.newaxis]
         y = y[:, np.newaxis]
@@ -148,6 +150,8 @@ class OLSPolynomialRegression:
 
     def __call__(self):
         """Return class calculation."""
+        import statsmodels.api as sm
+        from sklearn.preprocessing import PolynomialFeatures
         x = self.df['year'].values
         y = self.df[self.parameter].values
 
@@ -183,12 +187,102 @@ class CalculatorBase:
 
 
 class Calculator(CalculatorBase):
-    """Node Calculator."""
+    """Node Calculator.
 
-    def __init__(self, calculation_year=None):
-        """Initialize."""
+    The regression summary table (intervals, Cook's D, studentized residuals)
+    and the text summary are computed on first access and then cached.
+    """
+
+    def __init__(self, calculation_year=None, lean=False):
+        """Initialize.
+
+        Args:
+            calculation_year (int): Year of the annual mean water level.
+            lean (bool): Report-only calculations. The regression is fitted
+                in closed form (BatchedOLS) instead of with statsmodels and
+                the running mean is left empty.
+        """
         super().__init__()
         self.calc_year = calculation_year
+        self.lean = lean
+        self.running_mean = pd.Series(dtype=float)
+        self._regression_summary = None
+        self._batched_regression = None
+        self._summary = None
+        self._annual_mean_equation = None
+
+    @property
+    def regression_summary(self):
+        """Return regression summary table, see get_regression_summary."""
+        if self._regression_summary is None:
+            with Instrumentation.timer('summary_rendering'):
+                if self._batched_regression is not None:
+                    regression = self._batched_regression
+                    self._regression_summary = pd.DataFrame({
+                        'predicted_value': regression['predstd'],
+                        'mean_ci_lo': regression['ci_l'],
+                        'mean_ci_up': regression['ci_u'],
+                        'pred_ci_lo': regression['iv_l'],
+                        'pred_ci_up': regression['iv_u'],
+                    })
+                else:
+                    self._regression_summary = self.get_regression_summary(
+                        self.result,
+                        conf_int=0.05,
+                        as_dataframe=True
+                    )
+        return self._regression_summary
+
+    @regression_summary.setter
+    def regression_summary(self, table):
+        """Set regression_summary."""
+        self._regression_summary = table
+
+    @property
+    def predstd(self):
+        """Return predicted values."""
+        return self.regression_summary['predicted_value']
+
+    @property
+    def ci_l(self):
+        """Return lower limit of the confidence interval."""
+        return self.regression_summary['mean_ci_lo']
+
+    @property
+    def ci_u(self):
+        """Return upper limit of the confidence interval."""
+        return self.regression_summary['mean_ci_up']
+
+    @property
+    def iv_l(self):
+        """Return lower limit of the prediction interval."""
+        return self.regression_summary['pred_ci_lo']
+
+    @property
+    def iv_u(self):
+        """Return upper limit of the prediction interval."""
+        return self.regression_summary['pred_ci_up']
+
+    @property
+    def summary(self):
+        """Return text summary of the regression and the annual mean equation."""
+        if self._summary is None and self._annual_mean_equation is not None:
+            with Instrumentation.timer('summary_rendering'):
+                self._summary = self._annual_mean_equation.get_summary_string(
+                    self.result.summary2().as_text()
+                )
+        return self._summary
+
+    @summary.setter
+    def summary(self, text):
+        """Set summary."""
+        self._summary = text
+
+    def set_batched_regression(self, regression):
+        """Set result and regression summary from one station of BatchedOLS.get_results()."""
+        self._summary = None
+        self._batched_regression = regression
+        self.update_attributes(result=regression['result'], regression_summary=None)
 
     @staticmethod
     def calculate_wls_prediction_std(result):
@@ -196,6 +290,7 @@ class Calculator(CalculatorBase):
 
         https://www.statsmodels.org/stable/examples/notebooks/generated/wls.html
         """
+        from statsmodels.sandbox.regression.predstd import wls_prediction_std
         return wls_prediction_std(result)
 
     @staticmethod
@@ -215,6 +310,7 @@ class Calculator(CalculatorBase):
             'Student\nResidual': 'student_residual',
             "Cook's\nD": 'cooks'
         }
+        from statsmodels.stats.outliers_influence import summary_table
         # columns = columns or ['Mean ci\n95% low', 'Mean ci\n95% upp']
         simple_table, data_table, table_columns = summary_table(result, alpha=conf_int)
         table_columns = [column_mapper.get(c) for c in table_columns]
@@ -254,10 +350,12 @@ class Calculator(CalculatorBase):
 
             station_attr.setdefault('annual_mean', round_value(res, nr_decimals=1))
             station_attr.setdefault('apparent_land_uplift', round_value(k, nr_decimals=2))
-            station_attr.setdefault('summary', am.get_summary_string(self.result.summary2().as_text()))
+            self._annual_mean_equation = am
 
-            self.update_attributes(**station_attr)
+            # "year" is kept as the years of the regression data
+            self.update_attributes(**{k: v for k, v in station_attr.items() if k != 'year'})
 
+    @Instrumentation.timed('regression')
     def calculate_stats(self, data, parameter):
         """Calculate statistics."""
         data = data.assign(intercept=1., year=lambda x: x.timestamp.dt.year)
@@ -272,33 +370,56 @@ class Calculator(CalculatorBase):
             parameter=parameter,
         )
 
-        res = ols()
-
-        reg_sum = self.get_regression_summary(
-            res,
-            conf_int=0.05,
-            as_dataframe=True
-        )
+        if self.lean:
+            self.set_batched_regression(BatchedOLS(
+                data['year'].values[np.newaxis],
+                data[parameter].values[np.newaxis]
+            ).get_results()[0])
+        else:
+            self._summary = None
+            self._batched_regression = None
+            self.update_attributes(result=ols(), regression_summary=None)
 
         self.update_attributes(
-            result=res,
             data_values=data[parameter],
             year=data['year'],
-            predstd=reg_sum['predicted_value'],
-            ci_l=reg_sum['mean_ci_lo'],
-            ci_u=reg_sum['mean_ci_up'],
-            iv_l=reg_sum['pred_ci_lo'],
-            iv_u=reg_sum['pred_ci_up']
         )
 
 
+def calculate_station_statistics(name, index, timestamps, values, parameter=None,
+                                 station_attr=None, calculation_year=None, lean=False):
+    """Return name and Calculator with statistics for one station.
+
+    Used as process pool worker by Statistics.append_new_stations_parallel,
+    the station data is given as numpy arrays (index, timestamps, values).
+    Unless lean, the (otherwise lazy) regression summaries are computed here
+    so that the heavy work is done in the worker processes.
+    """
+    data = pd.DataFrame({'timestamp': timestamps, parameter: values}, index=index)
+    calculator = Calculator(calculation_year=calculation_year, lean=lean)
+    calculator.calculate_stats(data, parameter)
+    calculator.calculate_annual_mean_water_level(station_attr)
+    if not lean:
+        calculator.calculate_running_mean(data, parameter)
+        calculator.regression_summary
+        calculator.summary
+    return name, calculator
+
+
 class Statistics(dict):
     """Dictionary of stations with applied calculations."""
 
-    def __init__(self, calculation_year=None):
-        """Initialize."""
+    def __init__(self, calculation_year=None, lean=False):
+        """Initialize.
+
+        Args:
+            calculation_year (int): Year of the annual mean water level.
+            lean (bool): Report-only calculations, see Calculator. The running
+                mean is not calculated.
+        """
         super().__init__()
         self.calc_year = calculation_year or datetime.now().year
+        self.lean = lean
         print('Calculate annual mean water level for year {}'.format(self.calc_year))
 
     def append_new_station(self, **kwargs):
@@ -311,10 +432,76 @@ class Statistics(dict):
         if name:
             print('New station added: {}'.format(name))
 
-            self.setdefault(name, Calculator(calculation_year=self.calc_year))
+            self.setdefault(name, Calculator(calculation_year=self.calc_year, lean=self.lean))
+
+            with Instrumentation.station(name):
+                self[name].calculate_stats(kwargs.get('data'), kwargs.get('parameter'))
+
+                self[name].calculate_annual_mean_water_level(kwargs.get('station_attr'))
+
+                if not self.lean:
+                    self[name].calculate_running_mean(kwargs.get('data'), kwargs.get('parameter'))
+
+    def append_new_stations(self, stations, parameter=None):
+        """Append data and calculations for several stations to self.
 
-            self[name].calculate_stats(kwargs.get('data'), kwargs.get('parameter'))
+        The regressions of all stations are fitted at once with BatchedOLS
+        instead of one statsmodels OLS per station.
 
-            self[name].calculate_annual_mean_water_level(kwargs.get('station_attr'))
+        Args:
+            stations (dict): {name: {'data': Frame, 'station_attr': dict}}
+            parameter (str): Data column to fit.
+        """
+        names = list(stations)
+        datasets = []
+        for name in names:
+            data = stations[name].get('data')
+            data = data.assign(year=lambda x: x.timestamp.dt.year)
+            datasets.append(data.loc[data[parameter].notna()])
+
+        with Instrumentation.timer('regression'):
+            x, mask = pad_arrays([data['year'].values for data in datasets])
+            y, _ = pad_arrays([data[parameter].values for data in datasets])
+            regressions = BatchedOLS(x, y, mask=mask).get_results()
+
+        for name, data, regression in zip(names, datasets, regressions):
+            print('New station added: {}'.format(name))
+            self.setdefault(name, Calculator(calculation_year=self.calc_year, lean=self.lean))
+            self[name].set_batched_regression(regression)
+            self[name].update_attributes(
+                data_values=data[parameter],
+                year=data['year'],
+            )
+            self[name].calculate_annual_mean_water_level(stations[name].get('station_attr'))
+            if not self.lean:
+                self[name].calculate_running_mean(stations[name].get('data'), parameter)
+
+    def append_new_stations_parallel(self, stations, parameter=None, workers=None):
+        """Append data and calculations for several stations, calculated in a process pool.
+
+        Only numpy arrays (index, timestamp and parameter values) are sent to
+        the worker processes. Stations are added in the given order and the
+        results are identical to append_new_station.
 
-            self[name].calculate_running_mean(kwargs.get('data'), kwargs.get('parameter'))
+        Args:
+            stations (dict): {name: {'data': Frame, 'station_attr': dict}}
+            parameter (str): Data column to calculate statistics for.
+            workers (int): Number of processes, defaults to the number of CPUs.
+        """
+        names = list(stations)
+        with Instrumentation.timer('regression'), \
+                ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                calculate_station_statistics,
+                names,
+                [stations[name]['data'].index.values for name in names],
+                [stations[name]['data']['timestamp'].values for name in names],
+                [stations[name]['data'][parameter].values for name in names],
+                [parameter] * len(names),
+                [stations[name].get('station_attr') for name in names],
+                [self.calc_year] * len(names),
+                [self.lean] * len(names),
+            )
+            for name, calculator in results:
+                print('New station added: {}'.format(name))
+                self[name] = calculator
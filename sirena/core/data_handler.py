@@ -9,6 +9,9 @@ from abc import ABC
 import numpy as np
 import pandas as pd
 import datetime as dt
+from sirena.core.panel import Panel
+from sirena.core.quality import QualityFlags
+from sirena.instrumentation import Instrumentation
 
 
 class Frame(pd.DataFrame, ABC):
@@ -30,13 +33,21 @@ class Frame(pd.DataFrame, ABC):
         """
         return Frame
 
+    @Instrumentation.timed('convert_formats')
     def convert_formats(self):
-        """Convert formats of self."""
-        self['timestamp'] = self['timestamp'].apply(
-            lambda x: self.dt_start + dt.timedelta(milliseconds=float(x))
-        )
-        self[self.data_columns] = self[self.data_columns].astype(float)
+        """Convert formats of self.
 
+        Timestamps are converted in one vectorized step from milliseconds
+        since dt_start (negative before) to datetime64.
+        """
+        milliseconds = pd.to_numeric(self['timestamp']).astype(np.int64)
+        self['timestamp'] = pd.to_datetime(milliseconds, unit='ms', origin=self.dt_start)
+        data_columns = self.data_columns
+        self[data_columns] = self[data_columns].astype(float)
+        for qf_column in self.quality_flag_columns:
+            self[qf_column] = QualityFlags.parse_flags(self[qf_column])
+
+    @Instrumentation.timed('flag_masking')
     def exclude_flagged_data(self, q_flags=None):
         """Exclude flagged data.
 
@@ -45,33 +56,36 @@ class Frame(pd.DataFrame, ABC):
         4 (220) Bad
         8 (82) Interpolated
         ..found flag 255, presumably this indicates a bad value
+
+        Args:
+            q_flags (list): Flags to exclude, see QualityFlags.
         """
-        q_flags = q_flags or ['3', '4', '8', '82', '160', '220', '255']
+        QualityFlags(exclude_flags=q_flags).apply(self)
 
-        # qf_boolean = self['quality'].isin(q_flags)
-        # self.drop(self[qf_boolean].index, inplace=True)
+    def compact(self):
+        """Store self in compact dtypes.
 
+        Data values as float32 (cm precision is enough), quality flags as
+        uint8/int8 when all flag codes fit and timestamps as datetime64.
+        """
+        data_columns = self.data_columns
+        self[data_columns] = self[data_columns].astype(np.float32)
         for qf_column in self.quality_flag_columns:
-            qf_boolean = self[qf_column].isin(q_flags)
-            self.loc[qf_boolean, qf_column.replace('Q_', '')] = np.nan
+            codes = self[qf_column]
+            if codes.min() >= 0 and codes.max() <= np.iinfo(np.uint8).max:
+                self[qf_column] = codes.astype(np.uint8)
+            elif codes.min() >= np.iinfo(np.int8).min and codes.max() <= np.iinfo(np.int8).max:
+                self[qf_column] = codes.astype(np.int8)
 
     @property
     def data_columns(self):
         """Return (only) data columns."""
-        cols = []
-        for c in self.columns:
-            if c != 'timestamp' and not c.startswith('Q_'):
-                cols.append(c)
-        return cols
+        return [c for c in self.columns if c != 'timestamp' and not c.startswith('Q_')]
 
     @property
     def quality_flag_columns(self):
         """Return (only) flag columns."""
-        cols = []
-        for c in self.columns:
-            if c.startswith('Q_'):
-                cols.append(c)
-        return cols
+        return [c for c in self.columns if c.startswith('Q_')]
 
 
 class DataFrames(dict):
@@ -80,11 +94,49 @@ class DataFrames(dict):
     Use station name as key in this dictionary of Frame()-objects.
     """
 
+    def __init__(self, *args, **kwargs):
+        """Initialize."""
+        super().__init__(*args, **kwargs)
+        self.memory_usage_before_compact = {}
+        self._panel = None
+
     def append_new_frame(self, **kwargs):
-        """Append new Frame object to self."""
+        """Append new Frame object to self.
+
+        Args:
+            **kwargs: name, data, columns, quality_flags (list) and
+                compact (bool), see Frame.compact.
+        """
         name = kwargs.get('name')
         data = kwargs.get('data')
         if name:
+            self._panel = None
             self.setdefault(name, Frame(data, columns=kwargs.get('columns')))
+            if kwargs.get('compact'):
+                self.memory_usage_before_compact[name] = self[name].memory_usage(deep=True).sum()
             self[name].convert_formats()
-            self[name].exclude_flagged_data()
+            self[name].exclude_flagged_data(q_flags=kwargs.get('quality_flags'))
+            if kwargs.get('compact'):
+                self[name].compact()
+
+    @property
+    def panel(self):
+        """Return Panel (station x time x channel) of all frames.
+
+        Built on first access and kept until a new frame is appended.
+        """
+        if self._panel is None:
+            self._panel = Panel.from_frames(self)
+        return self._panel
+
+    def memory_report(self):
+        """Return memory usage in bytes per station.
+
+        "before" is the size of the data as read (before format conversion),
+        "after" the size as stored (converted, and compacted if selected).
+        Without compact storage only the stored size is known, for both.
+        """
+        after = {name: frame.memory_usage(deep=True).sum() for name, frame in self.items()}
+        before = {name: self.memory_usage_before_compact.get(name, size)
+                  for name, size in after.items()}
+        return pd.DataFrame({'before': before, 'after': after})
@@ -0,0 +1,142 @@
+# Copyright (c) 2020 SMHI, Swedish Meteorological and Hydrological Institute.
+# License: MIT License (see LICENSE.txt or http://opensource.org/licenses/mit).
+"""
+Created on 2026-10-19 02:40
+
+@author: johannes
+"""
+import numpy as np
+import pandas as pd
+from sirena.core.regression import BatchedOLS
+
+
+class Panel:
+    """Data of several stations in one store, for cross-station operations.
+
+    Values are kept in one station x time x channel array on a shared time
+    axis (NaN where a station has no value). Built once from DataFrames
+    (see DataFrames.panel), operations over all stations are then single
+    numpy calls:
+
+        panel = dfs.panel
+        panel.time_mean('RH2000_Year.Mean')
+        panel.anomalies('RH2000_Year.Mean', start='1991', end='2020')
+        panel.regression('RH2000_Year.Mean').get_results()
+    """
+
+    def __init__(self, values, stations=None, timestamps=None, channels=None):
+        """Initialize.
+
+        Args:
+            values (np.ndarray): 3D array (stations x time x channels).
+            stations (list): Station names.
+            timestamps (np.ndarray): Shared time axis (datetime64[ns]).
+            channels (list): Channel (data column) names.
+        """
+        self.values = values
+        self.stations = list(stations)
+        self.timestamps = pd.DatetimeIndex(timestamps, name='timestamp')
+        self.channels = list(channels)
+
+    @classmethod
+    def from_frames(cls, frames, channels=None, dtype=np.float64):
+        """Return Panel of frames.
+
+        Args:
+            frames (dict): {station name: Frame} with converted timestamps.
+            channels (list): Data columns to store, defaults to all data
+                columns (see Frame.data_columns) of the frames.
+            dtype: Dtype of the values, eg. np.float32 for compact storage.
+        """
+        stations = list(frames)
+        if channels is None:
+            channels = list(dict.fromkeys(
+                column for frame in frames.values() for column in frame.data_columns
+            ))
+        timestamps = [
+            frame['timestamp'].values.astype('datetime64[ns]').view(np.int64)
+            for frame in frames.values()
+        ]
+        time_axis = np.unique(np.concatenate(timestamps)) if timestamps \
+            else np.array([], dtype=np.int64)
+
+        values = np.full((len(stations), time_axis.size, len(channels)), np.nan, dtype=dtype)
+        for i, (frame, station_timestamps) in enumerate(zip(frames.values(), timestamps)):
+            positions = np.searchsorted(time_axis, station_timestamps)
+            for j, channel in enumerate(channels):
+                if channel in frame:
+                    values[i, positions, j] = frame[channel].to_numpy(dtype=dtype)
+        return cls(values, stations=stations, timestamps=time_axis.view('datetime64[ns]'),
+                   channels=channels)
+
+    def get_values(self, channel):
+        """Return values of channel as 2D array (stations x time)."""
+        return self.values[:, :, self.channels.index(channel)]
+
+    def to_frame(self, channel):
+        """Return values of channel as DataFrame (timestamp x station)."""
+        return pd.DataFrame(self.get_values(channel).T, index=self.timestamps,
+                            columns=self.stations)
+
+    def to_long(self, dropna=True):
+        """Return long (tidy) table with a categorical station column.
+
+        Columns: station, timestamp and one column per channel. Rows
+        without any value are dropped unless dropna is False.
+        """
+        nr_stations, nr_timestamps, nr_channels = self.values.shape
+        values = self.values.reshape(-1, nr_channels)
+        codes = np.repeat(np.arange(nr_stations), nr_timestamps)
+        timestamps = np.tile(self.timestamps.values, nr_stations)
+        if dropna:
+            boolean = ~np.isnan(values).all(axis=1)
+            values, codes, timestamps = values[boolean], codes[boolean], timestamps[boolean]
+
+        table = pd.DataFrame({
+            'station': pd.Categorical.from_codes(codes, categories=self.stations),
+            'timestamp': timestamps,
+        })
+        for j, channel in enumerate(self.channels):
+            table[channel] = values[:, j]
+        return table
+
+    def station_mean(self, channel):
+        """Return mean of channel per station."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values = self.get_values(channel)
+            means = np.nansum(values, axis=1) / np.isfinite(values).sum(axis=1)
+        return pd.Series(means, index=self.stations, name=channel)
+
+    def time_mean(self, channel):
+        """Return all-station mean of channel per timestamp."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values = self.get_values(channel)
+            means = np.nansum(values, axis=0) / np.isfinite(values).sum(axis=0)
+        return pd.Series(means, index=self.timestamps, name=channel)
+
+    def anomalies(self, channel, start=None, end=None):
+        """Return anomalies of channel (timestamp x station).
+
+        Values minus the station mean over the reference period start-end
+        (default the whole time axis).
+        """
+        boolean = np.ones(len(self.timestamps), dtype=bool)
+        if start is not None:
+            boolean &= self.timestamps >= pd.Timestamp(start)
+        if end is not None:
+            boolean &= self.timestamps <= pd.Timestamp(end)
+        values = self.get_values(channel)
+        reference = values[:, boolean]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.nansum(reference, axis=1) / np.isfinite(reference).sum(axis=1)
+        return pd.DataFrame((values - means[:, np.newaxis]).T, index=self.timestamps,
+                            columns=self.stations)
+
+    def regression(self, channel, alpha=0.05):
+        """Return BatchedOLS of channel against year, for all stations at once.
+
+        As Calculator.calculate_stats, x is the year of the timestamp.
+        """
+        y = self.get_values(channel)
+        x = np.broadcast_to(self.timestamps.year.values.astype(float), y.shape)
+        return BatchedOLS(x, y, mask=np.isfinite(y), alpha=alpha)
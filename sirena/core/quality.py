@@ -5,3 +5,64 @@ Created on 2020-04-16 14:09
 
 @author: a002028
 """
+import numpy as np
+import pandas as pd
+
+
+class QualityFlags:
+    """Quality flag engine.
+
+    Flags are handled as small integer codes (missing flag = -1). The flags
+    to exclude are stored in a boolean lookup table indexed by flag code, so
+    that all data columns of a frame can be masked in one numpy operation.
+    """
+
+    # 3 (160) Probably bad
+    # 4 (220) Bad
+    # 8 (82) Interpolated
+    # ..found flag 255, presumably this indicates a bad value
+    default_exclude_flags = (3, 4, 8, 82, 160, 220, 255)
+
+    def __init__(self, exclude_flags=None):
+        """Initialize.
+
+        Args:
+            exclude_flags (list): Flags (int or str) of values to exclude,
+                defaults to default_exclude_flags. An empty list excludes
+                nothing. Negative flags are ignored (no flag code is
+                negative, missing flags are never excluded).
+        """
+        exclude_flags = self.default_exclude_flags if exclude_flags is None else exclude_flags
+        self.exclude_flags = [int(flag) for flag in exclude_flags if int(flag) >= 0]
+        self.lookup = np.zeros(max(self.exclude_flags + [255]) + 1, dtype=bool)
+        self.lookup[self.exclude_flags] = True
+
+    @staticmethod
+    def parse_flags(flags):
+        """Return flags (eg. strings from the minidom parser) as int16 codes.
+
+        Flags that are missing, not numbers or outside 0-32767 are -1.
+        """
+        codes = pd.to_numeric(flags, errors='coerce')
+        codes = codes.where((codes >= 0) & (codes <= np.iinfo(np.int16).max), -1)
+        return codes.astype(np.int16)
+
+    def get_mask(self, codes):
+        """Return boolean array, True where the flag code is excluded."""
+        codes = np.asarray(codes)
+        in_range = (codes >= 0) & (codes < self.lookup.size)
+        return self.lookup[np.where(in_range, codes, 0)] & in_range
+
+    def apply(self, frame):
+        """Set flagged values of all data columns in frame to NaN.
+
+        Quality flag column "Q_<parameter>" belongs to data column "<parameter>".
+        """
+        qf_columns = [c for c in frame.quality_flag_columns if c[2:] in frame.columns]
+        if not qf_columns:
+            return
+        data_columns = [c[2:] for c in qf_columns]
+
+        values = frame[data_columns].to_numpy(dtype=float, copy=True)
+        values[self.get_mask(frame[qf_columns].to_numpy())] = np.nan
+        frame[data_columns] = values
@@ -0,0 +1,142 @@
+# Copyright (c) 2020 SMHI, Swedish Meteorological and Hydrological Institute.
+# License: MIT License (see LICENSE.txt or http://opensource.org/licenses/mit).
+"""
+Created on 2026-10-18 21:20
+
+@author: johannes
+"""
+import numpy as np
+
+
+def pad_arrays(arrays, fill_value=np.nan):
+    """Return ragged arrays as one padded 2D array (stations x values) and its mask."""
+    max_length = max((len(a) for a in arrays), default=0)
+    padded = np.full((len(arrays), max_length), fill_value, dtype=float)
+    mask = np.zeros((len(arrays), max_length), dtype=bool)
+    for i, array in enumerate(arrays):
+        padded[i, :len(array)] = array
+        mask[i, :len(array)] = True
+    return padded, mask
+
+
+class BatchedOLSResult:
+    """Simple linear regression result for one station out of a BatchedOLS.
+
+    Mimics the parts of the statsmodels result used in sirena (params, bse,
+    fittedvalues, nobs). summary2() fits the statsmodels model on demand.
+    """
+
+    def __init__(self, x=None, y=None, params=None, bse=None, fittedvalues=None):
+        """Initialize."""
+        self.x = x
+        self.y = y
+        self.params = params
+        self.bse = bse
+        self.fittedvalues = fittedvalues
+        self.nobs = len(x)
+
+    def summary2(self):
+        """Return statsmodels summary."""
+        import statsmodels.api as sm
+        return sm.OLS(self.y[:, np.newaxis], sm.add_constant(self.x[:, np.newaxis])).fit().summary2()
+
+
+class BatchedOLS:
+    """Closed form simple linear regression (y = intercept + slope * x) for many stations.
+
+    All stations are fitted in one numpy pass over padded arrays (stations x
+    values) where mask tells which values are valid. Gives the same
+    estimates and intervals as statsmodels OLS / summary_table.
+    """
+
+    def __init__(self, x, y, mask=None, alpha=0.05):
+        """Initialize.
+
+        Args:
+            x (np.ndarray): 2D array (stations x values), eg. year.
+            y (np.ndarray): 2D array (stations x values).
+            mask (np.ndarray): 2D boolean array, True for valid values.
+                Defaults to where both x and y are finite.
+            alpha (float): Significance level of the intervals (0.05 -> 95%).
+        """
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        if mask is None:
+            mask = np.isfinite(self.x) & np.isfinite(self.y)
+        self.mask = mask & np.isfinite(self.y)
+        self.alpha = alpha
+
+    def fit(self):
+        """Fit all stations and return dictionary of arrays.
+
+        Per station: nobs, intercept, slope, bse_intercept, bse_slope, k.
+        Per value (stations x values, NaN where masked): predstd (fitted
+        values), ci_l, ci_u (confidence interval of the mean), iv_l, iv_u
+        (prediction interval).
+        """
+        from scipy import stats
+        mask = self.mask
+        x = np.where(mask, self.x, 0.)
+        y = np.where(mask, self.y, 0.)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            nobs = mask.sum(axis=1)
+            x_mean = x.sum(axis=1) / nobs
+            y_mean = y.sum(axis=1) / nobs
+            dx = np.where(mask, x - x_mean[:, np.newaxis], 0.)
+            dy = np.where(mask, y - y_mean[:, np.newaxis], 0.)
+            sxx = (dx * dx).sum(axis=1)
+
+            slope = (dx * dy).sum(axis=1) / sxx
+            intercept = y_mean - slope * x_mean
+
+            fitted = intercept[:, np.newaxis] + slope[:, np.newaxis] * self.x
+            residual = np.where(mask, self.y - fitted, 0.)
+            dof = nobs - 2
+            scale = (residual * residual).sum(axis=1) / dof
+
+            bse_slope = np.sqrt(scale / sxx)
+            bse_intercept = np.sqrt(scale * (1. / nobs + x_mean ** 2 / sxx))
+
+            se_mean = np.sqrt(
+                scale[:, np.newaxis] * (1. / nobs[:, np.newaxis] + dx ** 2 / sxx[:, np.newaxis])
+            )
+            se_obs = np.sqrt(scale[:, np.newaxis] + se_mean ** 2)
+            t_value = stats.t.isf(self.alpha / 2., dof)[:, np.newaxis]
+
+        def masked(array):
+            return np.where(mask, array, np.nan)
+
+        return {
+            'nobs': nobs,
+            'intercept': intercept,
+            'slope': slope,
+            'bse_intercept': bse_intercept,
+            'bse_slope': bse_slope,
+            'k': slope * -1,
+            'predstd': masked(fitted),
+            'ci_l': masked(fitted - t_value * se_mean),
+            'ci_u': masked(fitted + t_value * se_mean),
+            'iv_l': masked(fitted - t_value * se_obs),
+            'iv_u': masked(fitted + t_value * se_obs),
+        }
+
+    def get_results(self):
+        """Return list with one BatchedOLSResult and fitted fields per station."""
+        fit = self.fit()
+        results = []
+        for i in range(self.x.shape[0]):
+            valid = self.mask[i]
+            result = BatchedOLSResult(
+                x=self.x[i, valid],
+                y=self.y[i, valid],
+                params=np.array([fit['intercept'][i], fit['slope'][i]]),
+                bse=np.array([fit['bse_intercept'][i], fit['bse_slope'][i]]),
+                fittedvalues=fit['predstd'][i, valid],
+            )
+            results.append({
+                'result': result,
+                'k': fit['k'][i],
+                **{key: fit[key][i, valid] for key in ('predstd', 'ci_l', 'ci_u', 'iv_l', 'iv_u')}
+            })
+        return results
@@ -5,91 +5,33 @@ Created on 2020-04-08 15:38
 
 @author: a002028
 """
+from operator import attrgetter
+import numpy as np
 import pandas as pd
+from sirena.utils import convert_projection
 
 
-class StationBase:
-    """Base for Station objects.
+def convert_date(value):
+    """Return date as isoformat string (Timestamps are converted)."""
+    if type(value) == pd.Timestamp:
+        return value.isoformat()
+    return value
 
-    Intends to guide attribute settings from station register (either WISKI or SAMSA)
-    """
-
-    def __init__(self):
-        """Initialize."""
-        super().__init__()
-        self.added_attributes = set([])
-        self._number = None
-        self._start_date = None
-        self._end_date = None
-        self._latitude = None
-        self._longitude = None
-
-    def __setattr__(self, key, value):
-        """Set attribute."""
-        super().__setattr__(key, value)
-        if key != 'added_attributes' and not key.startswith('_'):
-            self.added_attributes.add(key)
-
-    @property
-    def number(self):
-        """Return number."""
-        return self._number
-
-    @number.setter
-    def number(self, value):
-        """Set number."""
-        self._number = str(value)
-
-    @property
-    def start_date(self):
-        """Return start_date."""
-        return self._start_date
-
-    @start_date.setter
-    def start_date(self, start):
-        """Set start_date."""
-        if type(start) == pd.Timestamp:
-            start = start.isoformat()
-        self._start_date = start
-
-    @property
-    def end_date(self):
-        """Return end_date."""
-        return self._end_date
-
-    @end_date.setter
-    def end_date(self, end):
-        """Set end_date."""
-        if type(end) == pd.Timestamp:
-            end = end.isoformat()
-        self._end_date = end
 
-    @property
-    def latitude(self):
-        """Return latitude."""
-        return self._latitude
-
-    @latitude.setter
-    def latitude(self, value):
-        """Set latitude."""
-        self._latitude = round(float(value), 6)
-
-    @property
-    def longitude(self):
-        """Return longitude."""
-        return self._longitude
+def convert_position(value):
+    """Return position (decimal degrees) as float with 6 decimals."""
+    return round(float(value), 6)
 
-    @longitude.setter
-    def longitude(self, value):
-        """Set longitude."""
-        self._longitude = round(float(value), 6)
 
-
-class Station(StationBase):
+class Station:
     """Stores meta information for one, and only one, station.
 
     We intend to insert information from SAMSA (station information database)
 
+    Known fields (see fields) are stored in slots, any other attribute in
+    the mapping extras (still readable as station.<attribute>). Unset fields
+    are None.
+
     Example of attributes:
     - latitude
     - longitude
@@ -99,55 +41,397 @@ class Station(StationBase):
     - ...
     """
 
-    def __init__(self):
+    fields = (
+        'name', 'number', 'latitude', 'longitude', 'start_date', 'end_date',
+        'ref_value_2000', 'absolute_landlift', 'apparent_landlift', 'k_value', 'equation',
+        'annual_mean', 'apparent_land_uplift',
+        'template_name', 'template_number', 'template_latitude', 'template_longitude',
+    )
+    # fields returned as float arrays (None as NaN) by MultiStation.to_arrays
+    numeric_fields = frozenset((
+        'latitude', 'longitude', 'ref_value_2000', 'absolute_landlift', 'apparent_landlift',
+        'k_value', 'annual_mean', 'apparent_land_uplift',
+    ))
+    # conversion of field values when set (None is kept)
+    converters = {
+        'number': str,
+        'latitude': convert_position,
+        'longitude': convert_position,
+        'start_date': convert_date,
+        'end_date': convert_date,
+    }
+    __slots__ = fields + ('extras', )
+    _field_set = frozenset(fields)
+
+    def __init__(self, **kwargs):
         """Initialize."""
-        super().__init__()
+        object.__setattr__(self, 'extras', {})
+        if kwargs:
+            self.update_attributes(**kwargs)
+
+    def __getattr__(self, key):
+        """Return None for unset fields or the extra attribute key.
+
+        Only called when key is not a set field.
+        """
+        if key in self._field_set:
+            return None
+        try:
+            return object.__getattribute__(self, 'extras')[key]
+        except (KeyError, AttributeError):
+            raise AttributeError(
+                "'{}' object has no attribute '{}'".format(type(self).__name__, key)) from None
+
+    def __setattr__(self, key, value):
+        """Set attribute, as field or as extra attribute."""
+        self.update_attributes(**{key: value})
+
+    def __getstate__(self):
+        """Return state for pickle and copy."""
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        """Set state from pickle and copy."""
+        self.__init__(**state)
+
+    def __repr__(self):
+        """Return representation of the set attributes."""
+        return '{}({})'.format(type(self).__name__, ', '.join(
+            '{}={!r}'.format(key, value) for key, value in self.to_dict().items()))
 
     def update_attributes(self, **kwargs):
         """Update attributes."""
+        field_set = self._field_set
+        converters = self.converters
+        extras = self.extras
         for attribute, value in kwargs.items():
-            setattr(self, attribute, value)
+            if attribute in field_set:
+                if value is not None and attribute in converters:
+                    value = converters[attribute](value)
+                object.__setattr__(self, attribute, value)
+            else:
+                extras[attribute] = value
+
+    @classmethod
+    def from_converted(cls, attributes):
+        """Return Station of attributes with already converted values (see converters)."""
+        station = cls.__new__(cls)
+        extras = {}
+        object.__setattr__(station, 'extras', extras)
+        field_set = cls._field_set
+        for attribute, value in attributes.items():
+            if attribute in field_set:
+                object.__setattr__(station, attribute, value)
+            else:
+                extras[attribute] = value
+        return station
+
+    @property
+    def added_attributes(self):
+        """Return names of the set attributes."""
+        return set(self.to_dict())
+
+    def to_dict(self):
+        """Return the set attributes (fields that are not None and extras)."""
+        data = {field: getattr(self, field) for field in self.fields
+                if getattr(self, field) is not None}
+        data.update(self.extras)
+        return data
 
 
 class MultiStation(dict):
     """Stores meta information for multiple stations.
 
-    Uses station name as key in this dictionary of Station()-objects
+    Uses station name as key in this dictionary of Station()-objects.
+
+    Stations are also indexed by number and template_number and by position,
+    for nearest-station and within-radius queries (see get_nearest). The
+    indexes are kept up to date when stations are set, removed or updated
+    with update_station.
     """
 
+    # mean earth radius (km) of the haversine distances
+    earth_radius = 6371.0088
+
+    def __init__(self, *args, **kwargs):
+        """Initialize."""
+        super().__init__(*args, **kwargs)
+        # (latitude, longitude) --> projected (x, y), see get_projected_coordinates
+        self._projection_cache = {}
+        self._number_index = {}
+        self._template_number_index = {}
+        # BallTree over station positions, rebuilt on the next spatial query
+        # after a position has changed
+        self._spatial_index = None
+        self._spatial_names = []
+        for name in self:
+            self._update_indexes(name)
+
+    def __setitem__(self, name, station):
+        """Set station and index it."""
+        if name in self:
+            self._remove_from_indexes(name)
+        super().__setitem__(name, station)
+        self._update_indexes(name)
+        self._spatial_index = None
+
+    def __delitem__(self, name):
+        """Remove station and its index keys."""
+        self._remove_from_indexes(name)
+        super().__delitem__(name)
+        self._spatial_index = None
+
+    def __reduce__(self):
+        """Return pickle and copy recipe, the indexes are rebuilt."""
+        return self.__class__, (dict(self), )
+
+    def pop(self, name, *default):
+        """Remove station and return it (or default if not found)."""
+        if name not in self:
+            return super().pop(name, *default)
+        station = self[name]
+        del self[name]
+        return station
+
+    def popitem(self):
+        """Remove and return the last (name, station) pair."""
+        name = next(reversed(self))
+        return name, self.pop(name)
+
+    def setdefault(self, name, station=None):
+        """Return station name, set to station first if not found."""
+        if name not in self:
+            self[name] = station
+        return self[name]
+
+    def update(self, *args, **kwargs):
+        """Set stations from a mapping or (name, station) pairs."""
+        for name, station in dict(*args, **kwargs).items():
+            self[name] = station
+
+    def clear(self):
+        """Remove all stations."""
+        super().clear()
+        self._number_index = {}
+        self._template_number_index = {}
+        self._spatial_index = None
+
+    @staticmethod
+    def _get_index_keys(station):
+        """Return number and template_number keys of station.
+
+        A template_number (eg. "2588/33088") is also indexed by its parts.
+        """
+        number_keys = {station.number} if station.number is not None else set()
+        template_number = getattr(station, 'template_number', None)
+        template_keys = set()
+        if template_number:
+            template_keys = {key.strip() for key in
+                             (str(template_number), *str(template_number).split('/'))}
+        return number_keys, template_keys
+
+    def _update_indexes(self, name, old_keys=None):
+        """Update the number and template_number indexes for station name."""
+        old_keys = old_keys or (set(), set())
+        for index, old, new in zip((self._number_index, self._template_number_index),
+                                   old_keys, self._get_index_keys(self[name])):
+            for key in old - new:
+                if index.get(key) == name:
+                    del index[key]
+            for key in new:
+                index[key] = name
+
+    def _remove_from_indexes(self, name):
+        """Remove the number and template_number keys of station name."""
+        for index, keys in zip((self._number_index, self._template_number_index),
+                               self._get_index_keys(self[name])):
+            for key in keys:
+                if index.get(key) == name:
+                    del index[key]
+
+    def get_name_by_number(self, number):
+        """Return name of the station with number (None if not found)."""
+        return self._number_index.get(str(number))
+
+    def get_name_by_template_number(self, template_number):
+        """Return name of the station with template_number, or one part of it."""
+        return self._template_number_index.get(str(template_number).strip())
+
+    def resolve(self, key):
+        """Return station name for a name, number or template_number (None if not found)."""
+        if key is None:
+            return None
+        name = str(key).upper()
+        if name in self:
+            return name
+        name = self.get_name_by_number(key) or self.get_name_by_template_number(key)
+        return name if name in self else None
+
+    @property
+    def spatial_index(self):
+        """Return BallTree (haversine) of the station positions.
+
+        Stations without position (missing, NaN or 0) are not indexed.
+        """
+        if self._spatial_index is None:
+            from sklearn.neighbors import BallTree
+            arrays = self.to_arrays(['latitude', 'longitude'])
+            positions = np.column_stack((arrays['latitude'], arrays['longitude']))
+            boolean = np.isfinite(positions).all(axis=1) & (positions != 0).all(axis=1)
+            self._spatial_names = arrays['key'][boolean].tolist()
+            self._spatial_index = BallTree(np.radians(positions[boolean]), metric='haversine')
+        return self._spatial_index
+
+    def get_nearest(self, latitude, longitude, k=1):
+        """Return the k nearest stations as list of (name, distance in km)."""
+        tree = self.spatial_index
+        k = min(k, len(self._spatial_names))
+        if not k:
+            return []
+        distances, indices = tree.query(np.radians([[latitude, longitude]]), k=k)
+        return [(self._spatial_names[i], d * self.earth_radius)
+                for i, d in zip(indices[0], distances[0])]
+
+    def get_within_radius(self, latitude, longitude, radius):
+        """Return stations within radius (km) as list of (name, distance in km), nearest first."""
+        tree = self.spatial_index
+        if not self._spatial_names:
+            return []
+        indices, distances = tree.query_radius(
+            np.radians([[latitude, longitude]]), r=radius / self.earth_radius,
+            return_distance=True, sort_results=True
+        )
+        return [(self._spatial_names[i], d * self.earth_radius)
+                for i, d in zip(indices[0], distances[0])]
+
+    def get_projected_coordinates(self, names=None):
+        """Return x and y (EPSG:3857) of stations as numpy arrays.
+
+        Projected positions are cached per (latitude, longitude), so only new
+        or moved stations are reprojected on repeated calls.
+
+        Args:
+            names (list): Station names, defaults to all stations.
+        """
+        names = list(self) if names is None else names
+        positions = [(self[name].latitude, self[name].longitude) for name in names]
+        new_positions = list({p for p in positions if p not in self._projection_cache})
+        if new_positions:
+            lats, lons = zip(*new_positions)
+            xs, ys = convert_projection(lats, lons)
+            self._projection_cache.update(zip(new_positions, zip(xs.tolist(), ys.tolist())))
+        projected = np.array([self._projection_cache[p] for p in positions],
+                             dtype=np.float64).reshape(-1, 2)
+        return projected[:, 0], projected[:, 1]
+
+    def to_arrays(self, attributes=None, names=None, numeric=True):
+        """Return attributes of stations as a columnar dictionary of numpy arrays.
+
+        Numeric fields (Station.numeric_fields) are float arrays with NaN for
+        missing values and for values that are not numbers (eg. text set
+        from a text input). Other attributes are object arrays with None.
+        The key "key" holds the station names (keys of self).
+
+        Args:
+            attributes (list): Fields or extra attributes, defaults to Station.fields.
+            names (list): Station names, defaults to all stations.
+            numeric (bool): False to return all attributes as object arrays
+                with the values as set.
+        """
+        attributes = Station.fields if attributes is None else attributes
+        names = list(self) if names is None else list(names)
+        stations = [self[name] for name in names]
+        arrays = {'key': np.array(names, dtype=object)}
+        for attribute in attributes:
+            if attribute in Station.fields:
+                values = list(map(attrgetter(attribute), stations))
+            else:
+                values = [station.extras.get(attribute) for station in stations]
+            if numeric and attribute in Station.numeric_fields:
+                try:
+                    arrays[attribute] = np.array(values, dtype=float)
+                except (TypeError, ValueError):
+                    arrays[attribute] = pd.to_numeric(
+                        pd.Series(values, dtype=object), errors='coerce'
+                    ).to_numpy(dtype=float)
+            else:
+                arrays[attribute] = np.empty(len(values), dtype=object)
+                arrays[attribute][:] = values
+        return arrays
+
+    def to_frame(self, attributes=None, names=None, numeric=True):
+        """Return attributes of stations as DataFrame, indexed by station name.
+
+        See to_arrays.
+        """
+        arrays = self.to_arrays(attributes=attributes, names=names, numeric=numeric)
+        return pd.DataFrame(arrays, index=pd.Index(arrays.pop('key'), name='key'))
+
     def append_new_station(self, **kwargs):
         """Append new station."""
         name = kwargs.get('name')
         if name:
             name = name.upper()
             self.setdefault(name, Station())
-            self[name].update_attributes(**kwargs)
+            self.update_station(name, **kwargs)
+
+    def update_station(self, key, **kwargs):
+        """Update attributes of station key (name, if found) and the indexes."""
+        if key not in self:
+            return
+        station = self[key]
+        position = (station.latitude, station.longitude)
+        old_keys = self._get_index_keys(station)
+        station.update_attributes(**kwargs)
+        if (station.latitude, station.longitude) != position:
+            self._spatial_index = None
+        self._update_indexes(key, old_keys=old_keys)
 
     def read_from_wiski_elements(self, wiski_station_element_list):
         """Read element from wiski."""
         for element in wiski_station_element_list:
             self.append_new_station(**{e: v for e, v in element.attributes.items()})
 
-    def read_from_samsa_elements(self, samsa_station_element_list):
-        """Read element from samsa."""
-        mapping = {
-            'stationName': 'name',
-            'stationIdentity': 'number',
-            'wgs84Latitude': 'latitude',
-            'wgs84Longitude': 'longitude',
-        }
-        samsa_attributes = {
-            'referensvarde': 'ref_value_2000'
-        }
-        for element in samsa_station_element_list:
-            d = {}
-            for e, v in element.items():
-                d[mapping.get(e, e)] = v
-                if e == 'attributes':
-                    if isinstance(v, list):
-                        for attr_dict in v:
-                            if attr_dict.get('attributeKey') in samsa_attributes:
-                                mapped_key = samsa_attributes.get(attr_dict.get('attributeKey'))
-                                d[mapped_key] = float(attr_dict.get('attributeValue'))
-
-            self.append_new_station(**d)
+    def read_from_samsa_elements(self, samsa_station_element_list, field_mapping=None,
+                                 attribute_mapping=None):
+        """Read elements from samsa.
+
+        The elements are normalized to one table first, see
+        sirena.readers.samsa.get_station_table (mappings in etc/readers/samsa.yaml).
+        """
+        from sirena.readers.samsa import get_station_table
+        self.read_from_table(get_station_table(
+            samsa_station_element_list,
+            field_mapping=field_mapping,
+            attribute_mapping=attribute_mapping
+        ))
+
+    def read_from_table(self, table):
+        """Append or update stations from a table (DataFrame) with one row per station.
+
+        Columns are station attributes, the column "name" is required. Rows
+        without name are skipped and missing values (NaN) are left unset,
+        while None is set as any other value.
+        """
+        if table is None or table.empty or 'name' not in table:
+            return
+        table = table.loc[table['name'].notna() & (table['name'] != '')].copy()
+        keys = table['name'].astype(str).str.upper().tolist()
+        # convert field values column by column (as Station.converters)
+        for column in ('latitude', 'longitude'):
+            if column in table:
+                table[column] = pd.to_numeric(table[column]).round(6)
+        for column in ('number', 'start_date', 'end_date'):
+            if column in table:
+                converter = Station.converters[column]
+                table[column] = table[column].map(converter, na_action='ignore')
+        columns = list(table.columns)
+        rows = zip(*(table[column].tolist() for column in columns))
+
+        for key, row in zip(keys, rows):
+            # value == value is False for NaN (missing), None is kept
+            record = {attribute: value for attribute, value in zip(columns, row) if value == value}
+            if key in self:
+                self.update_station(key, **record)
+            else:
+                self[key] = Station.from_converted(record)
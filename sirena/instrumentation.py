@@ -0,0 +1,165 @@
+# Copyright (c) 2020 SMHI, Swedish Meteorological and Hydrological Institute.
+# License: MIT License (see LICENSE.txt or http://opensource.org/licenses/mit).
+"""
+Created on 2026-10-19 00:10
+
+@author: johannes
+"""
+import json
+import time
+import threading
+import datetime as dt
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+# station of the running task, set with Instrumentation.station()
+current_station = ContextVar('current_station', default=None)
+
+
+class Instrumentation:
+    """Timers and counters of the pipeline stages.
+
+    Stages are timed overall and per station (the station of the running
+    thread/task, see Instrumentation.station). Like ErrorCapturing, the
+    records are kept on the class:
+
+        Instrumentation.reset()
+        session.read(...)
+        Instrumentation.write_report('report.json')
+
+    Time of concurrent stages (eg. http_wait) is summed over all requests
+    and may therefore exceed the wall time.
+    """
+
+    enabled = True
+    started = time.perf_counter()
+    stages = {}
+    stations = {}
+    counters = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def add_time(cls, stage, seconds, station=None):
+        """Add time of stage."""
+        station = station or current_station.get()
+        with cls._lock:
+            record = cls.stages.setdefault(stage, {'count': 0, 'total': 0., 'max': 0.})
+            record['count'] += 1
+            record['total'] += seconds
+            record['max'] = max(record['max'], seconds)
+            if station is not None:
+                station_record = cls.stations.setdefault(station, {})
+                station_record[stage] = station_record.get(stage, 0.) + seconds
+
+    @classmethod
+    def count(cls, counter, value=1):
+        """Increase counter."""
+        if not cls.enabled:
+            return
+        with cls._lock:
+            cls.counters[counter] = cls.counters.get(counter, 0) + value
+
+    @classmethod
+    @contextmanager
+    def timer(cls, stage, station=None):
+        """Time the enclosed block as stage."""
+        if not cls.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls.add_time(stage, time.perf_counter() - start, station=station)
+
+    @classmethod
+    def timed(cls, stage):
+        """Return decorator timing the function as stage."""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with cls.timer(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    @contextmanager
+    def station(name):
+        """Attribute stages timed in the enclosed block (or task) to station."""
+        token = current_station.set(name)
+        try:
+            yield
+        finally:
+            current_station.reset(token)
+
+    @classmethod
+    def report(cls):
+        """Return timers and counters as dictionary."""
+        with cls._lock:
+            stages = {
+                stage: dict(record, mean=record['total'] / record['count'])
+                for stage, record in cls.stages.items()
+            }
+            return {
+                'created': dt.datetime.now().isoformat(timespec='seconds'),
+                'wall_time': time.perf_counter() - cls.started,
+                'stages': stages,
+                'stations': {name: dict(record) for name, record in cls.stations.items()},
+                'counters': dict(cls.counters),
+            }
+
+    @classmethod
+    def write_report(cls, path):
+        """Write report as json."""
+        with open(path, 'w', encoding='utf8') as fd:
+            json.dump(cls.report(), fd, indent=4, ensure_ascii=False)
+
+    @classmethod
+    def report_text(cls):
+        """Return time per stage as text (see report for all records)."""
+        report = cls.report()
+        lines = ['Stages (wall time {:.3f} sec):'.format(report['wall_time'])]
+        for stage, record in sorted(report['stages'].items(), key=lambda x: -x[1]['total']):
+            lines.append('\t-{}: {:.3f} sec ({} calls)'.format(stage, record['total'], record['count']))
+        return '\n'.join(lines)
+
+    @classmethod
+    def reset(cls):
+        """Reset timers and counters."""
+        with cls._lock:
+            cls.started = time.perf_counter()
+            cls.stages = {}
+            cls.stations = {}
+            cls.counters = {}
+
+    @staticmethod
+    @contextmanager
+    def profile(path, profiler='cprofile'):
+        """Profile the enclosed block.
+
+        Args:
+            path (str): Output file, pstats dump for cProfile (view with eg.
+                snakeviz) and html for pyinstrument.
+            profiler (str): "cprofile" or "pyinstrument" (optional dependency).
+        """
+        if profiler == 'pyinstrument':
+            from pyinstrument import Profiler
+            profiler = Profiler()
+            profiler.start()
+            try:
+                yield profiler
+            finally:
+                profiler.stop()
+                with open(path, 'w', encoding='utf8') as fd:
+                    fd.write(profiler.output_html())
+        else:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield profiler
+            finally:
+                profiler.disable()
+                profiler.dump_stats(path)
@@ -0,0 +1,114 @@
+# Copyright (c) 2020 SMHI, Swedish Meteorological and Hydrological Institute.
+# License: MIT License (see LICENSE.txt or http://opensource.org/licenses/mit).
+"""
+Created on 2026-10-18 22:40
+
+@author: johannes
+
+Synthetic Wiski and SAMSA payloads, used for offline benchmarks and tests.
+"""
+import numpy as np
+import pandas as pd
+from sirena.core.data_handler import DataFrames
+
+# Wiski quality flags, mostly good (1) with some flagged values
+QUALITY_FLAGS = np.array([1, 1, 1, 1, 1, 1, 1, 1, 3, 4, 8, 82, 160, 200, 220, 255])
+
+
+def get_station_names(nr_stations):
+    """Return synthetic station names."""
+    return ['STATION {}'.format(i) for i in range(nr_stations)]
+
+
+def get_series(nr_values, end='2020-12-31', freq='D', seed=0):
+    """Return synthetic sea level series (timestamp ms, value, quality).
+
+    Values follow a linear trend of -0.4 cm/year (land uplift) plus noise.
+    """
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range(end=end, periods=nr_values, freq=freq)
+    years = timestamps.year.values + timestamps.dayofyear.values / 366.
+    values = np.round(-0.4 * (years - 2000) + rng.normal(0, 5, nr_values), 1)
+    milliseconds = (timestamps - pd.Timestamp('1970-01-01')) // pd.Timedelta(milliseconds=1)
+    quality = rng.choice(QUALITY_FLAGS, nr_values)
+    return np.asarray(milliseconds, dtype=np.int64), values, quality
+
+
+def get_wiski_xml(nr_values=None, series=None, **kwargs):
+    """Return Wiski shaped timeseriesValueList xml (bytes).
+
+    Args:
+        nr_values (int): Number of values of a synthetic series (see get_series).
+        series (tuple): Arrays (timestamp ms, value, quality) to use instead.
+        **kwargs: Passed on to get_series.
+    """
+    timestamps, values, quality = series or get_series(nr_values, **kwargs)
+    rows = ''.join(
+        '<timeseriesvalue timestamp="{}" quality="{}">{}</timeseriesvalue>\n'.format(t, q, v)
+        for t, v, q in zip(timestamps, values, quality)
+    )
+    return ''.join((
+        '<?xml version="1.0" encoding="UTF-8"?>\n<timeseries>\n<timeseriesValueList>\n',
+        rows,
+        '</timeseriesValueList>\n</timeseries>\n'
+    )).encode('utf8')
+
+
+def get_wiski_station_xml(nr_stations=None, station_names=None):
+    """Return Wiski shaped station register xml (bytes).
+
+    Args:
+        nr_stations (int): Number of synthetic stations (see get_station_names).
+        station_names (list): Station names to use instead.
+    """
+    station_names = station_names or get_station_names(nr_stations)
+    nr_stations = max(len(station_names), 1)
+    rows = ''.join(
+        '<station name="{}" number="{}" latitude="{}" longitude="{}"/>\n'.format(
+            name, 2000 + i, 55. + i * 10. / nr_stations, 12. + i * 10. / nr_stations)
+        for i, name in enumerate(station_names)
+    )
+    return ''.join((
+        '<?xml version="1.0" encoding="UTF-8"?>\n<stations>\n', rows, '</stations>\n'
+    )).encode('utf8')
+
+
+def get_samsa_data(nr_stations=None, seed=0, station_names=None):
+    """Return SAMSA shaped station metadata (dictionary, as the json response).
+
+    Args:
+        nr_stations (int): Number of synthetic stations (see get_station_names).
+        seed (int): Seed of the random positions and reference values.
+        station_names (list): Station names to use instead.
+    """
+    rng = np.random.default_rng(seed)
+    data = []
+    for i, name in enumerate(station_names or get_station_names(nr_stations)):
+        data.append({
+            'stationName': name,
+            'stationIdentity': str(2000 + i),
+            'ownerName': 'SMHI',
+            'wgs84Latitude': round(55. + rng.random() * 10., 6),
+            'wgs84Longitude': round(11. + rng.random() * 12., 6),
+            'attributes': [
+                {'attributeKey': 'referensvarde', 'attributeValue': str(round(rng.normal(0, 10), 1))},
+                {'attributeKey': 'stationstyp', 'attributeValue': 'havsvattenstand'},
+            ],
+        })
+    return {'data': data}
+
+
+def get_dataframes(nr_stations, nr_values, channels=('Year.Mean', ), freq='YS',
+                   parameter='RH2000'):
+    """Return DataFrames (converted and flag-masked) of synthetic stations."""
+    dfs = DataFrames()
+    for i, name in enumerate(get_station_names(nr_stations)):
+        columns = {}
+        for j, channel in enumerate(channels):
+            timestamps, values, quality = get_series(nr_values, freq=freq, seed=i * 10 + j)
+            columns['timestamp'] = timestamps
+            columns['_'.join((parameter, channel))] = values
+            columns['_'.join(('Q', parameter, channel))] = quality
+        df = pd.DataFrame(columns)
+        dfs.append_new_frame(name=name, data=df, columns=df.columns)
+    return dfs
@@ -0,0 +1,295 @@
+# Copyright (c) 2020 SMHI, Swedish Meteorological and Hydrological Institute.
+# License: MIT License (see LICENSE.txt or http://opensource.org/licenses/mit).
+"""
+Created on 2026-10-18 23:40
+
+@author: johannes
+
+Local stand-in for the Wiski and SAMSA servers.
+
+Serves Wiski shaped timeseriesValueList xml, the Wiski station register and
+SAMSA shaped json from generated (or recorded) fixtures, with configurable
+latency, error rate and payload size:
+
+    with StandInServer(latency=0.05, error_rate=0.1) as server:
+        server.write_server_info('srv.json')
+        ...
+
+or from the command line:
+
+    python -m sirena.offline.server --port 8000 --latency 0.05 --server-info srv.json
+
+and point sirena to it with the environment variable SIRENA_SERVER_INFO_PATH.
+"""
+import os
+import json
+import time
+import zlib
+import argparse
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+import numpy as np
+import pandas as pd
+from sirena.offline.fixtures import (
+    get_series,
+    get_wiski_xml,
+    get_wiski_station_xml,
+    get_samsa_data
+)
+from sirena.readers.yaml_reader import YAMLreader
+
+# pandas frequency of the Wiski channel periods (eg. "Year.Mean")
+CHANNEL_FREQUENCIES = {'Year': 'YS', 'Month': 'MS', 'Day': 'D', 'Hour': 'h'}
+
+
+def get_sirena_station_names():
+    """Return the station list of sirena (etc/stations.yaml)."""
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+                        'etc', 'stations.yaml')
+    return YAMLreader().load_yaml([path], return_dict=True).get('station_list')
+
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+    """Request handler of StandInServer.
+
+    Routes:
+        /wiski                                  station register (xml)
+        /wiski/<number>/<parameter>/<channel>   series (xml), ?from=..&to=..
+        /samsa                                  station metadata (json)
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        """Respond to GET request."""
+        server = self.server
+        server.count_request()
+        with server.track_connection():
+            if server.latency:
+                time.sleep(server.latency + server.rng_uniform(0, server.jitter))
+            if server.error_rate and server.rng_uniform(0, 1) < server.error_rate:
+                server.count_error()
+                self.send_content(b'Service Unavailable', 'text/plain', status=503)
+                return
+            try:
+                content, content_type = server.get_content(self.path)
+            except KeyError:
+                self.send_content(b'Not Found', 'text/plain', status=404)
+                return
+        self.send_content(content, content_type)
+
+    def send_content(self, content, content_type, status=200):
+        """Send response."""
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        """Log requests only when the server is verbose."""
+        if self.server.verbose:
+            super().log_message(*args)
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Local http server standing in for Wiski and SAMSA."""
+
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0., jitter=0., error_rate=0.,
+                 nr_values=None, max_values=100000, station_names=None,
+                 recording_directory=None, seed=0, verbose=False):
+        """Initialize.
+
+        Args:
+            host (str): Host to bind.
+            port (int): Port to bind, 0 picks a free port.
+            latency (float): Delay in seconds of every response.
+            jitter (float): Additional random delay, up to jitter seconds.
+            error_rate (float): Share of requests (0-1) answered with "503
+                Service Unavailable".
+            nr_values (int): Fixed number of values per series. By default
+                the number of values follows the requested time window.
+            max_values (int): Maximum number of values per series.
+            station_names (list): Stations to serve. Defaults to the station
+                list of sirena (etc/stations.yaml).
+            recording_directory (str): Directory with recorded responses,
+                served instead of the generated fixtures when found. Files
+                are named after the url path, eg. "wiski/2001/RH2000/Year.Mean.xml"
+                or "samsa.json".
+            seed (int): Seed of the random latency and errors.
+            verbose (bool): Log requests.
+        """
+        super().__init__((host, port), StandInRequestHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.nr_values = nr_values
+        self.max_values = max_values
+        self.station_names = station_names or get_sirena_station_names()
+        self.recording_directory = recording_directory
+        self.verbose = verbose
+        self.counts = {'requests': 0, 'errors': 0, 'max_concurrent_requests': 0}
+        self._connections = 0
+        self._lock = threading.Lock()
+        self._rng = np.random.default_rng(seed)
+        self._thread = None
+
+    def __enter__(self):
+        """Start serving in a background thread."""
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        """Stop serving."""
+        self.stop()
+
+    def start(self):
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()
+
+    @property
+    def url(self):
+        """Return base url of the server."""
+        host, port = self.server_address[:2]
+        return 'http://{}:{}'.format(host, port)
+
+    def get_server_info(self):
+        """Return server settings (as in srv.json) pointing to this server."""
+        return {
+            'server_wiski': self.url + '/wiski',
+            'server_samsa': self.url + '/samsa?',
+        }
+
+    def write_server_info(self, path):
+        """Write srv.json pointing to this server."""
+        with open(path, 'w', encoding='utf8') as fd:
+            json.dump(self.get_server_info(), fd, indent=4)
+
+    def rng_uniform(self, low, high):
+        """Return random number (thread safe)."""
+        with self._lock:
+            return self._rng.uniform(low, high)
+
+    def count_request(self):
+        """Count request."""
+        with self._lock:
+            self.counts['requests'] += 1
+
+    def count_error(self):
+        """Count error response."""
+        with self._lock:
+            self.counts['errors'] += 1
+
+    @contextmanager
+    def track_connection(self):
+        """Count requests in progress (and the maximum number of them)."""
+        with self._lock:
+            self._connections += 1
+            self.counts['max_concurrent_requests'] = max(
+                self.counts['max_concurrent_requests'], self._connections)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._connections -= 1
+
+    def get_content(self, path):
+        """Return response content (bytes) and content type for path.
+
+        Raises KeyError for unknown paths.
+        """
+        parts = urlsplit(path)
+        route = [unquote(p) for p in parts.path.split('/') if p]
+        recording = self.get_recording(route)
+        if recording is not None:
+            return recording
+
+        if route == ['wiski']:
+            return get_wiski_station_xml(station_names=self.station_names), 'application/xml'
+        elif route == ['samsa']:
+            data = get_samsa_data(station_names=self.station_names)
+            return json.dumps(data).encode('utf8'), 'application/json'
+        elif len(route) == 4 and route[0] == 'wiski':
+            query = parse_qs(parts.query)
+            return self.get_series_xml(*route[1:], **{k: v[0] for k, v in query.items()}), \
+                'application/xml'
+        raise KeyError(path)
+
+    def get_recording(self, route):
+        """Return recorded content and content type for route, if there is one."""
+        if not self.recording_directory or not route:
+            return None
+        for suffix, content_type in (('.xml', 'application/xml'), ('.json', 'application/json')):
+            path = os.path.join(self.recording_directory, *route[:-1], route[-1] + suffix)
+            if os.path.isfile(path):
+                with open(path, 'rb') as fd:
+                    return fd.read(), content_type
+        return None
+
+    def get_series_xml(self, station, parameter, channel, **query):
+        """Return timeseriesValueList xml of a synthetic series.
+
+        The series is reproducible per station, parameter and channel.
+        """
+        freq = CHANNEL_FREQUENCIES.get(channel.split('.')[0], 'D')
+        end = pd.Timestamp(query.get('to') or '2020-12-31')
+        if self.nr_values is not None:
+            nr_values = self.nr_values
+        else:
+            start = pd.Timestamp(query.get('from') or end - pd.DateOffset(years=100))
+            nr_values = len(pd.date_range(start, end, freq=freq))
+        nr_values = min(nr_values, self.max_values)
+        seed = zlib.crc32('/'.join((station, parameter, channel)).encode('utf8'))
+        return get_wiski_xml(series=get_series(nr_values, end=end, freq=freq, seed=seed))
+
+
+def main():
+    """Run stand-in server from the command line."""
+    parser = argparse.ArgumentParser(description='Local stand-in for the Wiski and SAMSA servers.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0., help='delay (s) of every response')
+    parser.add_argument('--jitter', type=float, default=0., help='additional random delay (s)')
+    parser.add_argument('--error-rate', type=float, default=0., help='share of 503 responses')
+    parser.add_argument('--nr-values', type=int, default=None, help='fixed values per series')
+    parser.add_argument('--max-values', type=int, default=100000, help='max values per series')
+    parser.add_argument('--recordings', default=None, help='directory of recorded responses')
+    parser.add_argument('--server-info', default=None, help='write srv.json to this path')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    server = StandInServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        nr_values=args.nr_values,
+        max_values=args.max_values,
+        recording_directory=args.recordings,
+        verbose=args.verbose,
+    )
+    if args.server_info:
+        server.write_server_info(args.server_info)
+        print('Server info written to: {}'.format(args.server_info))
+    print('Serving on {}'.format(server.url))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,8 @@ Created on 2020-04-17 09:50
 
 @author: a002028
 """
+import base64
+import numpy as np
 from bokeh.models import Button, FileInput, CustomJS, TextInput
 from bokeh.layouts import row, column, Spacer
 from bokeh.events import ButtonClick
@@ -13,6 +15,20 @@ from functools import partial
 
 # FIXME We need to clean this shit up! No parameter hardcoding! Tidy up!!!
 
+def encode_array(values, dtype='float32'):
+    """Return values as base64 encoded (little endian) buffer and its dtype.
+
+    Decoded into a typed array (eg. Float32Array) by the "binary" station
+    callback. Single precision is plenty for display of sea levels in cm.
+
+    Args:
+        values (array_like): Values to encode.
+        dtype (str): "float32", "float64" or "int32".
+    """
+    array = np.asarray(values, dtype=np.dtype(dtype).newbyteorder('<'))
+    return {'dtype': dtype, 'data': base64.b64encode(array.tobytes()).decode('ascii')}
+
+
 def get_download_widget():
     """Return Button widget."""
     button = Button(label="Download selected data", button_type="success", width=40)
@@ -41,37 +57,114 @@ class TextInputWidget(dict):
         """))
         self['button'] = Button(label=kwargs.get('button_label') or 'Save',
                                 width=50, button_type='success')
+        self.on_save = kwargs.get('on_save')
         self['button'].on_event(ButtonClick, partial(self.callback, text=self['text_obj']))
 
         self.layout = row([self['text_obj'], column([Spacer(height=18), self['button']])])
 
-    @staticmethod
-    def callback(text=None):
-        """Print text."""
-        print('text.value', text.value)
+    def callback(self, *args, text=None):
+        """Pass name and text value to on_save, or print the text."""
+        if self.on_save:
+            self.on_save(self['name'], text.value)
+        else:
+            print('text.value', text.value)
+
+
+# Regression line (y = m * x + b) for the data from the selected start year
+# and onwards. Sums of the values from index i to the end are computed once per
+# station (regression_sums, from the year and data_values columns), so that
+# each slider move is a binary search and a few operations.
+REGRESSION_LINE_JS = """
+function regression_sums(year, values) {
+    // sum_<n, x, y, xx, xy>[i] is the sum from value i to the end (the last
+    // item is 0), with x = year - x_ref. Summed in double precision.
+    var length = year.length;
+    var regression = {
+        year: year,
+        x_ref: length ? year[0] : 0,
+        x_first: year[0],
+        x_last: year[length - 1]
+    };
+    for (var key of ['sum_n', 'sum_x', 'sum_y', 'sum_xx', 'sum_xy']) {
+        regression[key] = new Float64Array(length + 1);
+    }
+    for (var i = length - 1; i >= 0; i--) {
+        var valid = values[i] !== null && isFinite(values[i]);
+        var x = valid ? year[i] - regression.x_ref : 0;
+        var y = valid ? values[i] : 0;
+        regression.sum_n[i] = regression.sum_n[i + 1] + (valid ? 1 : 0);
+        regression.sum_x[i] = regression.sum_x[i + 1] + x;
+        regression.sum_y[i] = regression.sum_y[i + 1] + y;
+        regression.sum_xx[i] = regression.sum_xx[i + 1] + x * x;
+        regression.sum_xy[i] = regression.sum_xy[i + 1] + x * y;
+    }
+    return regression;
+}
+
+function regression_line(regression, start_year) {
+    // index of the first value from start_year
+    var year = regression.year;
+    var i = 0;
+    var j = year.length;
+    while (i < j) {
+        var middle = (i + j) >> 1;
+        if (year[middle] < start_year) {
+            i = middle + 1;
+        } else {
+            j = middle;
+        }
+    }
+    var n = regression.sum_n[i];
+    var sum_x = regression.sum_x[i];
+    var sum_y = regression.sum_y[i];
+    var m = (n * regression.sum_xy[i] - sum_x * sum_y) / (n * regression.sum_xx[i] - sum_x * sum_x);
+    var b = (sum_y - m * sum_x) / n;
+    // x is centered on x_ref
+    var x_first = regression.x_first;
+    var x_last = regression.x_last;
+    return {
+        year: [x_first, x_last],
+        additional_regression: [
+            m * (x_first - regression.x_ref) + b,
+            m * (x_last - regression.x_ref) + b
+        ]
+    };
+}
+"""
 
 
 def station_callback(plot_source=None, data_source=None, station_source=None,
-                     text_source=None, text_input_list=None):
-    """JS callback for stations in GUI."""
-    code = """
-    // Get data from python dictionary
-    var selected_data = {
-        year: [],
-        iv_l: [],
-        iv_u: [],
-        ci_l: [],
-        ci_u: [],
-        running_mean: [],
-        fitted_values: [],
-        additional_regression: [],
-        data_values: []
-    };
-    var data = source;
-    var text_input_list = text_input_list;
+                     text_source=None, text_input_list=None, regression_source=None,
+                     slider=None, data_mode='lists'):
+    """JS callback for stations in GUI.
+
+    The plot columns of a station are prepared once, the first time the
+    station is selected, after that selecting a station only swaps the data
+    of plot_source.
+
+    Args:
+        data_mode (str): "lists" when the station data are plain lists or
+            "binary" when they are base64 encoded buffers (see encode_array).
+    """
+    code = REGRESSION_LINE_JS + """
+    var typed_arrays = {float32: Float32Array, float64: Float64Array, int32: Int32Array};
+
+    function decode(encoded) {
+        if (!binary) {
+            return encoded;
+        }
+        var bytes_string = atob(encoded.data);
+        var bytes = new Uint8Array(bytes_string.length);
+        for (var i = 0; i < bytes_string.length; i++) {
+            bytes[i] = bytes_string.charCodeAt(i);
+        }
+        return new typed_arrays[encoded.dtype](bytes.buffer);
+    }
 
-    // Get indices array of all selected items (in this case stations on the map)
     var selected_index = station_source.selected.indices[0];
+    if (selected_index === undefined) {
+        return;
+    }
     var station = station_source.data.STATN[selected_index];
     var text_values = {
         ref_value_2000: station_source.data.ref_value_2000[selected_index].toString(),
@@ -79,7 +172,6 @@ def station_callback(plot_source=None, data_source=None, station_source=None,
         k_value: station_source.data.k_value[selected_index].toString()
     };
 
-    // console.log('selected station', station)
     var txt_name;
     for (var i = 0; i < text_input_list.length; i++) {
         txt_name = text_input_list[i].name;
@@ -88,94 +180,47 @@ def station_callback(plot_source=None, data_source=None, station_source=None,
         }
     }
 
-    var year_val, iv_l_val, iv_u_val, ci_l_val, ci_u_val, runmean_val, fitted_val, data_val;
-    for (var i = 0; i < data[station].year.length; i++) {
-        year_val = data[station].year[i];
-        iv_l_val = data[station].iv_l[i];
-        iv_u_val = data[station].iv_u[i];
-        ci_l_val = data[station].ci_l[i];
-        ci_u_val = data[station].ci_u[i];
-        runmean_val = data[station].running_mean[i];
-        fitted_val = data[station].fitted_values[i];
-        data_val = data[station].data_values[i];
-
-        selected_data.year.push(year_val);
-        selected_data.iv_l.push(iv_l_val);
-        selected_data.iv_u.push(iv_u_val);
-        selected_data.ci_l.push(ci_l_val);
-        selected_data.ci_u.push(ci_u_val);
-        selected_data.running_mean.push(runmean_val);
-        selected_data.fitted_values.push(fitted_val);
-        selected_data.additional_regression.push(fitted_val);
-        selected_data.data_values.push(data_val);
+    // Prepare the columns of the station once, on first selection
+    var station_data = source[station];
+    if (!station_data.plot_data) {
+        var columns = station_data.columns;
+        station_data.plot_data = {};
+        for (var key of plot_columns) {
+            station_data.plot_data[key] = decode(columns[key]);
+        }
+        station_data.regression = regression_sums(
+            station_data.plot_data.year, station_data.plot_data.data_values
+        );
     }
-    //console.log('data[station].text', data[station].text)
 
-    plot_source.data = selected_data;
-    text_source.text = data[station].text;
+    plot_source.data = station_data.plot_data;
+    // kept on the source for the slider callback
+    regression_source.station_regression = station_data.regression;
+    regression_source.data = regression_line(station_data.regression, slider.value);
+    text_source.text = station_data.text;
     """
-    # Create a CustomJS callback with the code and the data
     return CustomJS(args={'source': data_source,
                           'plot_source': plot_source,
                           'station_source': station_source,
                           'text_source': text_source,
                           'text_input_list': text_input_list,
+                          'regression_source': regression_source,
+                          'slider': slider,
+                          'binary': data_mode == 'binary',
+                          'plot_columns': list(plot_source.data),
                           },
                     code=code)
 
 
-def slider_callback(source=None):
-    """JS callback for sliders in GUI."""
-    code = """
-    var data = source.data;
-    var selected_year = cb_obj.value;
-    var x_values = data['year'];
-    var y_values = data['data_values'];
-
-    //console.log('y_values', y_values)
-
-    var sum_x = 0;
-    var sum_y = 0;
-    var sum_xy = 0;
-    var sum_xx = 0;
-    var count = 0;
-
-    var x_reg = 0;
-    var y_reg = 0;
-    var values_length = x_values.length;
-
-    for (var i = 0; i < values_length; i++) {
-        x_reg = x_values[i];
-        if (x_reg >= selected_year) {
-            y_reg = y_values[i];
-            sum_x += x_reg;
-            sum_y += y_reg;
-            sum_xx += x_reg*x_reg;
-            sum_xy += x_reg*y_reg;
-            count++;
-        }
-    }
+def slider_callback(regression_source=None):
+    """JS callback for sliders in GUI.
 
-    /* Calculate m and b for the formular:
-     * y = x * m + b
-     */
-    var m = (count*sum_xy - sum_x*sum_y) / (count*sum_xx - sum_x*sum_x);
-    var b = (sum_y/count) - (m*sum_x)/count;
-    //console.log('m', m)
-    //console.log('b', b)
-    var result_values_y = [];
-    var x = 0;
-    var y = 0;
-    for (var i = 0; i < values_length; i++) {
-        x = x_values[i];
-        //console.log('x', x)
-        y = x * m + b;
-        result_values_y.push(y);
+    Recalculates the regression of the selected station (set on
+    regression_source by the station callback) from the precomputed sums.
+    """
+    code = REGRESSION_LINE_JS + """
+    if (regression_source.station_regression) {
+        regression_source.data = regression_line(regression_source.station_regression, cb_obj.value);
     }
-
-    //console.log('result_values_y', result_values_y)
-
-    data['additional_regression'] = result_values_y;
-    source.change.emit();
     """
-    return CustomJS(args=dict(source=source), code=code)
+    return CustomJS(args={'regression_source': regression_source}, code=code)
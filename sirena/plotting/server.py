@@ -0,0 +1,198 @@
+# Copyright (c) 2020 SMHI, Swedish Meteorological and Hydrological Institute.
+# License: MIT License (see LICENSE.txt or http://opensource.org/licenses/mit).
+"""
+Created on 2026-10-19 01:20
+
+@author: johannes
+
+Bokeh server mode of the GUI.
+
+Instead of baking the data of all stations into a static html file, only the
+selected station is sent over the websocket. Regressions for the slider are
+run on the server and saved text inputs are written to the Station objects:
+
+    serve(stations=session.stations, statistics=stats)
+
+or, from an application script started with "bokeh serve --show app.py":
+
+    ServerPlot(stations=..., statistics=...).show_plot()
+"""
+import numpy as np
+import pandas as pd
+from bokeh.io import curdoc
+from sirena.core.calculator import Calculator
+from sirena.core.station import Station
+from sirena.plotting.widgets import Plot
+
+
+class ServerPlot(Plot):
+    """Plot for a bokeh server document, with python callbacks.
+
+    Each browser session needs its own ServerPlot (bokeh models can not be
+    shared between documents), see get_application.
+    """
+
+    def __init__(self, stations=None, statistics=None, parameter='value'):
+        """Initialize.
+
+        Args:
+            stations (MultiStation): Station information, updated by the
+                text inputs.
+            statistics (Statistics): Calculations per station.
+            parameter (str): Column name of the values in the (server side)
+                regressions for the slider.
+        """
+        self.parameter = parameter
+        self.selected_station = None
+        super().__init__(stations=stations, statistics=statistics, data_mode='server')
+
+    def _setup_output(self, output_filename, as_output_notebook):
+        """Set no output file, the layout is added to the server document."""
+        pass
+
+    def _setup_data_source(self):
+        """Set no data source, station data are sent when selected."""
+        self.data_source = {}
+
+    def _setup_text_inputs(self):
+        """Set text objects, saved values are written to the selected station."""
+        super()._setup_text_inputs()
+        for text_input in self.text_inputs:
+            text_input.on_save = self.save_station_attribute
+
+    def _setup_slider_callback(self):
+        """Set python callback for the slider, the regression is updated on release."""
+        self.slider.on_change('value_throttled', self.on_slider_change)
+
+    def _setup_station_callback(self, tap):
+        """Set python callback for selection of stations."""
+        self.position_source.selected.on_change('indices', self.on_station_selection)
+
+    @staticmethod
+    def replace_data(source, columns):
+        """Replace all data of source with columns.
+
+        Sent as one stream message (with rollover), which transfers the
+        numpy arrays as binary buffers.
+        """
+        length = len(next(iter(columns.values()), []))
+        if length and set(columns) == set(source.data):
+            source.stream(columns, rollover=length)
+        else:
+            source.data = columns
+
+    def on_station_selection(self, attr, old, new):
+        """Send the data of the selected station."""
+        if not new:
+            return
+        index = new[0]
+        name = self.position_source.data['STATN'][index]
+        self.selected_station = name
+        item = self.statistics[name]
+
+        self.replace_data(self.plot_source, {
+            key: np.asarray(values, dtype=np.int32 if key == 'year' else np.float64)
+            for key, values in self.get_station_columns(item).items()
+        })
+        self.update_regression()
+        self.text.text = item.summary
+
+        station = self.stations.get(name) if self.stations else None
+        for text_input in self.text_inputs:
+            value = getattr(station, text_input['name'], None)
+            if value is not None:
+                text_input['text_obj'].value = str(value)
+
+    def on_slider_change(self, attr, old, new):
+        """Update the regression test of the selected station."""
+        self.update_regression()
+
+    def update_regression(self):
+        """Patch the regression test line of the selected station."""
+        line = self.get_regression_line(self.selected_station, self.slider.value)
+        if len(line['year']) == len(self.regression_source.data['year']) == 2:
+            self.regression_source.patch({key: [(slice(0, 2), values)] for key, values in line.items()})
+        else:
+            self.regression_source.data = line
+
+    def get_regression_line(self, name, start_year):
+        """Return the regression of the values from start_year and onwards.
+
+        The regression is calculated with Calculator (lean mode). As in the
+        static GUI (REGRESSION_LINE_JS), the line spans all years of the
+        station.
+        """
+        item = self.statistics.get(name) if name else None
+        if item is None:
+            return {'year': [], 'additional_regression': []}
+        boolean = (item.year >= start_year) & item.data_values.notna()
+        if boolean.sum() < 2:
+            return {'year': [], 'additional_regression': []}
+
+        data = pd.DataFrame({
+            'timestamp': pd.to_datetime(item.year[boolean].astype(str), format='%Y'),
+            self.parameter: item.data_values[boolean].astype(float),
+        })
+        calculator = Calculator(calculation_year=self.statistics.calc_year, lean=True)
+        calculator.calculate_stats(data, self.parameter)
+        intercept, slope = np.asarray(calculator.result.params).ravel()
+        years = [int(item.year.iloc[0]), int(item.year.iloc[-1])]
+        return {
+            'year': years,
+            'additional_regression': [float(intercept + slope * year) for year in years],
+        }
+
+    def save_station_attribute(self, attribute, value):
+        """Write value (text input) to the selected station.
+
+        Values of numeric attributes (see Station.numeric_fields) are stored
+        as float, values that are not numbers are not saved. Columns of the
+        map source (eg. ref_value_2000) are patched with the new value.
+        """
+        if not self.selected_station or not self.stations \
+                or self.selected_station not in self.stations:
+            return
+        if attribute in Station.numeric_fields:
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                return
+        self.stations[self.selected_station].update_attributes(**{attribute: value})
+
+        if attribute in self.position_source.data:
+            names = np.asarray(self.position_source.data['STATN'], dtype=object)
+            self.position_source.patch({
+                attribute: [(int(index), value) for index in np.flatnonzero(names == self.selected_station)]
+            })
+
+    def show_plot(self, doc=None):
+        """Add bokeh plot layout to doc (default: the current document)."""
+        doc = doc or curdoc()
+        doc.add_root(self.get_layout())
+        doc.title = 'SIRENA'
+
+
+def get_application(stations=None, statistics=None, **kwargs):
+    """Return bokeh Application, with one ServerPlot per browser session."""
+    from bokeh.application import Application
+    from bokeh.application.handlers.function import FunctionHandler
+
+    def make_document(doc):
+        ServerPlot(stations=stations, statistics=statistics, **kwargs).show_plot(doc)
+
+    return Application(FunctionHandler(make_document))
+
+
+def serve(stations=None, statistics=None, port=5006, show=True, **kwargs):
+    """Serve the GUI with a bokeh server (blocks until interrupted)."""
+    from bokeh.server.server import Server
+    server = Server({'/': get_application(stations=stations, statistics=statistics, **kwargs)},
+                    port=port)
+    server.start()
+    if show:
+        server.io_loop.add_callback(server.show, '/')
+    print('Serving on http://localhost:{}/'.format(server.port))
+    try:
+        server.io_loop.start()
+    except KeyboardInterrupt:
+        server.io_loop.stop()
@@ -5,47 +5,47 @@ Created on 2020-04-09 17:26
 
 @author: a002028
 """
+import numpy as np
 from bokeh.io import output_notebook
 from bokeh.models import ColumnDataSource, Slider, PreText, Circle, TapTool, \
     HoverTool, WheelZoomTool, ResetTool, PanTool, SaveTool, LassoSelectTool
 from bokeh.layouts import grid, row, column
 from bokeh.plotting import figure, show, output_file
 from bokeh.tile_providers import get_provider, Vendors
-import pyproj
-from sirena.plotting.callbacks import station_callback, slider_callback, TextInputWidget
-
-
-def convert_projection(lats, lons):
-    """Transform coordinates from one spatial reference system to another.
-
-    From WGS84 --> Google projection
-    To find your EPSG check this website: http://spatialreference.org/ref/epsg/.
-    """
-    project_projection = pyproj.Proj({'init': 'epsg:4326', 'no_defs': True}, preserve_flags=True)
-    google_projection = pyproj.Proj({'init': 'epsg:3857', 'no_defs': True}, preserve_flags=True)
-
-    x, y = pyproj.transform(
-        project_projection,
-        google_projection,
-        lons,
-        lats
-    )
-    return x, y
+from sirena.plotting.callbacks import station_callback, slider_callback, TextInputWidget, \
+    encode_array
+from sirena.instrumentation import Instrumentation
+from sirena.utils import convert_projection  # noqa: F401
 
 
 class Plot:
     """Main class for bokeh plotting."""
 
+    # range of the slider for the start year of the regression test
+    slider_start = 1850
+    slider_end = 2020
+
+    @Instrumentation.timed('plotting')
     def __init__(self, stations=None, statistics=None,
-                 output_filename=None, as_output_notebook=False):
-        """Initialize."""
-        if as_output_notebook:
-            output_notebook()
-        else:
-            output_file(output_filename or "SMISK_VIZ.html")
+                 output_filename=None, as_output_notebook=False, data_mode='binary'):
+        """Initialize.
+
+        Args:
+            stations (MultiStation): Station information.
+            statistics (Statistics): Calculations per station.
+            output_filename (str): Path to html file.
+            as_output_notebook (bool): Show in notebook instead of html file.
+            data_mode (str): How the station data are stored in the html,
+                "binary" (base64 encoded buffers, int32 years and float32
+                values, decoded when a station is selected) or "lists"
+                (plain json lists).
+        """
+        self.data_mode = data_mode
+        self._setup_output(output_filename, as_output_notebook)
 
         self.tile_provider = get_provider(Vendors.CARTODBPOSITRON_RETINA)
 
+        self.stations = stations
         self.statistics = statistics
         self._setup_position_source(stations)
         self._setup_text_inputs()
@@ -57,6 +57,13 @@ class Plot:
         self.plot_stations()
         self.plot_stats()
 
+    def _setup_output(self, output_filename, as_output_notebook):
+        """Set output (html file or notebook) of show_plot."""
+        if as_output_notebook:
+            output_notebook()
+        else:
+            output_file(output_filename or "SMISK_VIZ.html")
+
     def _setup_plot_source(self):
         """Set bokeh ColumnDataSource for GUI plotting."""
         self.plot_source = ColumnDataSource(
@@ -68,10 +75,16 @@ class Plot:
                 ci_u=[],
                 fitted_values=[],
                 running_mean=[],
-                additional_regression=[],
                 data_values=[],
             )
         )
+        # regression test line (two points), updated by the slider
+        self.regression_source = ColumnDataSource(
+            data=dict(
+                year=[],
+                additional_regression=[],
+            )
+        )
 
     def _setup_position_source(self, stations):
         """Set bokeh ColumnDataSource for stations."""
@@ -80,22 +93,23 @@ class Plot:
                             'LONGI_DD', 'ref_value_2000', 'absolute_landlift', 'k_value')
         }
         if stations:
-            for _, statn_obj in stations.items():
-                if statn_obj.latitude \
-                        and statn_obj.longitude \
-                        and statn_obj.name in self.statistics:
-                    position_df['STATN'].append(statn_obj.name)
-                    position_df['LATIT'].append(statn_obj.latitude)
-                    position_df['LONGI'].append(statn_obj.longitude)
-                    position_df['LATIT_DD'].append(str(statn_obj.latitude))
-                    position_df['LONGI_DD'].append(str(statn_obj.longitude))
-                    position_df['ref_value_2000'].append(statn_obj.ref_value_2000)
-                    position_df['absolute_landlift'].append(statn_obj.absolute_landlift)
-                    position_df['k_value'].append(statn_obj.k_value)
-
-            xs, ys = convert_projection(position_df['LATIT'], position_df['LONGI'])
-            position_df['LONGI'] = xs
-            position_df['LATIT'] = ys
+            arrays = stations.to_arrays(
+                ['name', 'latitude', 'longitude', 'ref_value_2000', 'absolute_landlift', 'k_value']
+            )
+            boolean = (np.nan_to_num(arrays['latitude']) != 0) \
+                & (np.nan_to_num(arrays['longitude']) != 0) \
+                & np.isin(arrays['name'], list(self.statistics or []))
+            xs, ys = stations.get_projected_coordinates(arrays['key'][boolean])
+            position_df.update({
+                'STATN': arrays['name'][boolean].tolist(),
+                'LATIT': ys,
+                'LONGI': xs,
+                'LATIT_DD': arrays['latitude'][boolean].astype(str).tolist(),
+                'LONGI_DD': arrays['longitude'][boolean].astype(str).tolist(),
+                'ref_value_2000': arrays['ref_value_2000'][boolean],
+                'absolute_landlift': arrays['absolute_landlift'][boolean],
+                'k_value': arrays['k_value'][boolean],
+            })
 
         self.position_source = ColumnDataSource(data=position_df)
 
@@ -107,17 +121,27 @@ class Plot:
         self.data_source = {}
         if self.statistics:
             for name, item in self.statistics.items():
-                self.data_source[name] = {
-                    'year': item.year,
-                    'iv_l': item.iv_l,
-                    'iv_u': item.iv_u,
-                    'ci_l': item.ci_l,
-                    'ci_u': item.ci_u,
-                    'running_mean': item.running_mean,
-                    'fitted_values': item.result.fittedvalues,
-                    'data_values': item.data_values,
-                    'text': item.summary,
-                }
+                columns = self.get_station_columns(item)
+                if self.data_mode == 'binary':
+                    columns = {
+                        key: encode_array(values, dtype='int32' if key == 'year' else 'float32')
+                        for key, values in columns.items()
+                    }
+                self.data_source[name] = {'columns': columns, 'text': item.summary}
+
+    @staticmethod
+    def get_station_columns(item):
+        """Return plot columns of one station (Calculator)."""
+        return {
+            'year': item.year,
+            'iv_l': item.iv_l,
+            'iv_u': item.iv_u,
+            'ci_l': item.ci_l,
+            'ci_u': item.ci_u,
+            'running_mean': item.running_mean.reindex(item.year.index),
+            'fitted_values': item.result.fittedvalues,
+            'data_values': item.data_values,
+        }
 
     def _setup_text_inputs(self):
         """Set text objects."""
@@ -158,13 +182,19 @@ class Plot:
         # self.map.yaxis.axis_label = ' '  # in order to aline y-axis with figure window below
         self.map.toolbar.active_scroll = self.map.select_one(WheelZoomTool)
         self.map.add_tile(self.tile_provider)
+        self._setup_station_callback(tap)
 
+    def _setup_station_callback(self, tap):
+        """Set callback for selection of stations."""
         tap.callback = station_callback(
             plot_source=self.plot_source,
             data_source=self.data_source,
             text_source=self.text,
             station_source=self.position_source,
             text_input_list=self.text_inputs,
+            regression_source=self.regression_source,
+            slider=self.slider,
+            data_mode=self.data_mode,
         )
 
     def _setup_text_block(self):
@@ -179,13 +209,17 @@ class Plot:
     def _setup_slider_regression(self):
         """Set bokeh slider object."""
         self.slider = Slider(
-            start=1850,
-            end=2020,
-            value=1850,
+            start=self.slider_start,
+            end=self.slider_end,
+            value=self.slider_start,
             step=1,
             title="Start year (regression test)",
         )
-        self.slider.js_on_change('value', slider_callback(source=self.plot_source))
+        self._setup_slider_callback()
+
+    def _setup_slider_callback(self):
+        """Set callback for the slider."""
+        self.slider.js_on_change('value', slider_callback(regression_source=self.regression_source))
 
     def plot_stations(self):
         """Plot bokeh circles on map-object."""
@@ -249,16 +283,20 @@ class Plot:
                        source=self.plot_source, legend_label='95% confidence interval')
 
         self.plot.line('year', 'additional_regression', color="green", line_width=2,
-                       alpha=0.5, source=self.plot_source, legend_label='Regression Test')
+                       alpha=0.5, source=self.regression_source, legend_label='Regression Test')
 
         self.plot.legend.location = "top_right"
         self.plot.legend.click_policy = "hide"
 
-    def show_plot(self):
-        """Show bokeh plot layoyt"""
-        layout_grid = grid([
+    def get_layout(self):
+        """Return bokeh plot layout."""
+        return grid([
             row([
                 column([self.map, self.plot, self.slider]),
                 column([*[t.layout for t in self.text_inputs], self.text])])],
             sizing_mode='stretch_both')
-        show(layout_grid)
+
+    @Instrumentation.timed('plotting')
+    def show_plot(self):
+        """Show bokeh plot layoyt"""
+        show(self.get_layout())
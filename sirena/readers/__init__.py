@@ -5,7 +5,26 @@ Created on 2020-04-07 10:33
 
 @author: a002028
 """
-from sirena.readers.wiski import Wiski, WiskiStationRegister  # noqa: F401
-from sirena.readers.samsa import SAMSAData  # noqa: F401
-from sirena.readers.yaml_reader import YAMLreader  # noqa: F401
-from sirena.readers.json_reader import JSONreader  # noqa: F401
+import importlib
+
+# readers are imported on first use
+_lazy_attributes = {
+    'HTTPClient': 'sirena.readers.client',
+    'Wiski': 'sirena.readers.wiski',
+    'WiskiStationRegister': 'sirena.readers.wiski',
+    'SAMSAData': 'sirena.readers.samsa',
+    'YAMLreader': 'sirena.readers.yaml_reader',
+    'JSONreader': 'sirena.readers.json_reader',
+}
+
+
+def __getattr__(name):
+    """Import reader on first use."""
+    if name in _lazy_attributes:
+        return getattr(importlib.import_module(_lazy_attributes[name]), name)
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+def __dir__():
+    """Return attributes, including readers not imported yet."""
+    return sorted(list(globals()) + list(_lazy_attributes))
@@ -0,0 +1,133 @@
+# Copyright (c) 2020 SMHI, Swedish Meteorological and Hydrological Institute.
+# License: MIT License (see LICENSE.txt or http://opensource.org/licenses/mit).
+"""
+Created on 2026-10-18 20:05
+
+@author: johannes
+"""
+import os
+import time
+import hashlib
+import pandas as pd
+from sirena.config import ErrorCapturing
+from sirena.utils import check_path
+
+
+class SeriesCache:
+    """On-disk cache of fetched timeseries, stored as feather files.
+
+    Entries are keyed by the request url, which for Wiski is the combination
+    of server, station number, parameter, channel and time window.
+    """
+
+    suffix = '.feather'
+
+    def __init__(self, directory=None, ttl=None, max_size=None):
+        """Initialize.
+
+        Args:
+            directory (str): Folder of the cache files.
+            ttl (float): Time to live in seconds. Older entries are only
+                returned when asked for explicitly (eg. when offline).
+            max_size (float): Maximum size of the cache in MB. The least
+                recently written entries are evicted first.
+        """
+        self.directory = str(directory)
+        self.ttl = ttl
+        self.max_size = max_size
+
+    @staticmethod
+    def get_key(*args):
+        """Return cache key for the given arguments."""
+        return hashlib.sha1('/'.join(map(str, args)).encode('utf8')).hexdigest()
+
+    def get_path(self, key):
+        """Return file path of cache entry."""
+        return os.path.join(self.directory, key + self.suffix)
+
+    def is_expired(self, key):
+        """Return True if the cache entry is older than ttl."""
+        if not self.ttl:
+            return False
+        return time.time() - os.path.getmtime(self.get_path(key)) > self.ttl
+
+    def get(self, key, ignore_ttl=False):
+        """Return cached dataframe or None.
+
+        Entries that can not be read (eg. truncated files) are removed and
+        treated as missing.
+        """
+        path = self.get_path(key)
+        try:
+            if not os.path.exists(path):
+                return None
+            if not ignore_ttl and self.is_expired(key):
+                return None
+            return pd.read_feather(path)
+        except Exception:
+            self.remove(key)
+            return None
+
+    def set(self, key, df):
+        """Store dataframe in cache.
+
+        The file is written to a temporary file and then moved into place,
+        so readers never see a partly written entry. Failed writes (eg. a
+        full disk) are recorded with ErrorCapturing, the entry is then not
+        stored.
+        """
+        path = self.get_path(key)
+        tmp_path = path + '.{}.tmp'.format(os.getpid())
+        try:
+            check_path(self.directory)
+            df.reset_index(drop=True).to_feather(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            ErrorCapturing.append_error(Error=e, Cache=path)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def remove(self, key):
+        """Remove cache entry, if it exists."""
+        try:
+            os.remove(self.get_path(key))
+        except OSError:
+            pass
+
+    def get_entries(self):
+        """Return list of (path, modified time, size) for all entries."""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for fid in os.listdir(self.directory):
+            if fid.endswith(self.suffix):
+                stat = os.stat(os.path.join(self.directory, fid))
+                entries.append((os.path.join(self.directory, fid), stat.st_mtime, stat.st_size))
+        return entries
+
+    def evict(self):
+        """Remove the oldest entries until the cache fits within max_size."""
+        if not self.max_size:
+            return
+        entries = sorted(self.get_entries(), key=lambda entry: entry[1])
+        size = sum(entry[2] for entry in entries)
+        max_size = self.max_size * 1024 ** 2
+        for path, _, file_size in entries:
+            if size <= max_size:
+                break
+            os.remove(path)
+            size -= file_size
+
+    def purge_expired(self):
+        """Remove all entries older than ttl."""
+        if not self.ttl:
+            return
+        now = time.time()
+        for path, mtime, _ in self.get_entries():
+            if now - mtime > self.ttl:
+                os.remove(path)
+
+    def clear(self):
+        """Remove all entries."""
+        for path, _, _ in self.get_entries():
+            os.remove(path)
@@ -0,0 +1,128 @@
+# Copyright (c) 2020 SMHI, Swedish Meteorological and Hydrological Institute.
+# License: MIT License (see LICENSE.txt or http://opensource.org/licenses/mit).
+"""
+Created on 2026-10-18 19:30
+
+@author: johannes
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from sirena.instrumentation import Instrumentation
+
+
+def run(coroutine):
+    """Run coroutine to completion and return its result.
+
+    Uses asyncio.run, unless an event loop is already running in this
+    thread (eg. in Jupyter or a bokeh server), where asyncio.run can not be
+    used. The coroutine is then run on a new event loop in a separate thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+
+class HTTPClient:
+    """Asynchronous http client with one pooled session per server.
+
+    Requests are sent through a requests.Session per host (keep-alive
+    connection pool) and awaited from asyncio. The pooled sessions live as
+    long as the client, so they can be reused over several event loops:
+
+        client = HTTPClient(max_concurrency=8, per_host_limit=4)
+
+        async def fetch(urls):
+            async with client:
+                return await asyncio.gather(*(client.aget(u) for u in urls))
+
+        run(fetch(urls))
+        client.close()
+    """
+
+    def __init__(self, max_concurrency=8, per_host_limit=4, timeout=60):
+        """Initialize.
+
+        Args:
+            max_concurrency (int): Maximum number of requests in flight.
+            per_host_limit (int): Maximum number of requests in flight, and
+                pooled connections, per host.
+            timeout (float): Timeout in seconds for each request.
+        """
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self._sessions = {}
+        self._executor = None
+        self._executor_size = None
+        self._semaphore = None
+        self._host_semaphores = {}
+
+    async def __aenter__(self):
+        """Set up concurrency limits for the running event loop."""
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._host_semaphores = {}
+        if self._executor is None or self._executor_size != self.max_concurrency:
+            if self._executor is not None:
+                self._executor.shutdown()
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+            self._executor_size = self.max_concurrency
+        return self
+
+    async def __aexit__(self, *exc_info):
+        """Release concurrency limits, pooled connections are kept."""
+        self._semaphore = None
+        self._host_semaphores = {}
+
+    def close(self):
+        """Close pooled sessions."""
+        for session in self._sessions.values():
+            session.close()
+        self._sessions = {}
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def get_session(self, host):
+        """Return pooled session for the given host."""
+        if host not in self._sessions:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.per_host_limit)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._sessions[host] = session
+        return self._sessions[host]
+
+    async def aget(self, url):
+        """Return response content (bytes) for url.
+
+        Raises requests.exceptions.RequestException for failed requests and
+        asyncio.TimeoutError when the request exceeds the timeout.
+        """
+        if self._semaphore is None:
+            raise RuntimeError('HTTPClient must be used within "async with client:"')
+
+        host = urlsplit(url).netloc
+        session = self.get_session(host)
+        host_semaphore = self._host_semaphores.setdefault(
+            host, asyncio.Semaphore(self.per_host_limit)
+        )
+        async with self._semaphore, host_semaphore:
+            loop = asyncio.get_running_loop()
+            Instrumentation.count('requests')
+            with Instrumentation.timer('http_wait'):
+                response = await asyncio.wait_for(
+                    loop.run_in_executor(
+                        self._executor,
+                        partial(session.get, url, timeout=self.timeout)
+                    ),
+                    self.timeout
+                )
+        response.raise_for_status()
+        return response.content
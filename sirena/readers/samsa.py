@@ -5,7 +5,61 @@ Created on 2020-10-19 13:53
 
 @author: a002028
 """
+import json
+import asyncio
+import numpy as np
+import pandas as pd
 import requests
+from sirena.config import ErrorCapturing
+
+# SAMSA field --> station attribute, see etc/readers/samsa.yaml
+DEFAULT_FIELD_MAPPING = {
+    'stationName': 'name',
+    'stationIdentity': 'number',
+    'wgs84Latitude': 'latitude',
+    'wgs84Longitude': 'longitude',
+}
+# SAMSA attributeKey --> station attribute (numeric), see etc/readers/samsa.yaml
+DEFAULT_ATTRIBUTE_MAPPING = {
+    'referensvarde': 'ref_value_2000',
+}
+
+
+def get_station_table(data, field_mapping=None, attribute_mapping=None):
+    """Return SAMSA station records as one table (DataFrame), one row per station.
+
+    Fields are renamed with field_mapping (other fields are kept as is).
+    Field columns are object columns with the values as given (eg. int
+    stationIdentity and explicit None), fields missing in a record are NaN.
+    The nested "attributes" lists are flattened in one pass and the values
+    of the keys in attribute_mapping are added as numeric columns (NaN if
+    missing or not a number).
+
+    Args:
+        data (list): SAMSA records (the "data" of the json response).
+        field_mapping (dict): SAMSA field --> station attribute.
+        attribute_mapping (dict): SAMSA attributeKey --> station attribute.
+    """
+    field_mapping = DEFAULT_FIELD_MAPPING if field_mapping is None else field_mapping
+    attribute_mapping = DEFAULT_ATTRIBUTE_MAPPING if attribute_mapping is None else attribute_mapping
+    # object dtype, records without some fields must not upcast the others
+    # (eg. number 2507 to 2507.0)
+    table = pd.DataFrame(data or [], dtype=object)
+
+    if 'attributes' in table and attribute_mapping:
+        attributes = pd.DataFrame(
+            [(row, item.get('attributeKey'), item.get('attributeValue'))
+             for row, items in enumerate(table['attributes']) if isinstance(items, list)
+             for item in items if item.get('attributeKey') in attribute_mapping],
+            columns=['row', 'key', 'value']
+        )
+        for key, column in attribute_mapping.items():
+            values = np.full(len(table), np.nan)
+            selected = attributes.loc[attributes['key'] == key]
+            values[selected['row'].values] = pd.to_numeric(selected['value'], errors='coerce')
+            table[column] = values
+
+    return table.rename(columns=field_mapping)
 
 
 class SAMSABase:
@@ -87,3 +141,13 @@ class SAMSAData(SAMSABase):
             print(e)
             # logging.warning('Could not load data.')
         return data
+
+    async def aget_data(self, client):
+        """Return data requested through the asynchronous client."""
+        data = None
+        try:
+            data = json.loads(await client.aget(self.url))
+            data = data.get('data')
+        except (requests.exceptions.RequestException, asyncio.TimeoutError, ValueError) as e:
+            ErrorCapturing.append_error(Error=e, Reader=self.__class__.__name__)
+        return data
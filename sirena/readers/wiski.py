@@ -5,9 +5,60 @@ Created on 2020-04-07 12:59
 
 @author: a002028
 """
+import io
+import asyncio
+import numpy as np
 import pandas as pd
 import urllib
+import requests
 import xml.dom.minidom as minidom
+from xml.parsers.expat import ExpatError
+import xml.etree.ElementTree as ElementTree
+from sirena.config import ErrorCapturing
+from sirena.instrumentation import Instrumentation
+
+
+def parse_timeseries_stream(source, chunk_size=4096):
+    """Parse a Wiski timeseriesValueList without building a DOM.
+
+    Values are read straight into preallocated numpy arrays, which are
+    grown (doubled) whenever they run full.
+
+    Args:
+        source: File path or file-like object (eg. an http response).
+        chunk_size (int): Initial size of the preallocated arrays.
+
+    Returns:
+        Tuple of arrays (timestamp, value, quality).
+    """
+    size = chunk_size
+    timestamps = np.empty(size, dtype=np.int64)
+    values = np.empty(size, dtype=np.float64)
+    quality = np.empty(size, dtype=np.int16)
+
+    count = 0
+    open_elements = []
+    for event, element in ElementTree.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            open_elements.append(element)
+            continue
+        open_elements.pop()
+        if element.tag.rsplit('}', 1)[-1] != 'timeseriesvalue':
+            continue
+        if count == size:
+            size *= 2
+            timestamps = np.resize(timestamps, size)
+            values = np.resize(values, size)
+            quality = np.resize(quality, size)
+
+        timestamps[count] = int(element.get('timestamp'))
+        values[count] = float(element.text) if element.text else np.nan
+        quality[count] = int(element.get('quality', -1))
+        count += 1
+        # Drop parsed values from the parent so that no tree is built up
+        del open_elements[-1][:]
+
+    return timestamps[:count], values[:count], quality[:count]
 
 
 class WiskiBase:
@@ -21,6 +72,7 @@ class WiskiBase:
         self._time_window = None
         self.parameter = None
         self.channel = None
+        self.parser = 'minidom'
 
     def update_attributes(self, **kwargs):
         """Update attributes."""
@@ -86,16 +138,31 @@ class Wiski(WiskiBase):
         """Initialize."""
         super(Wiski, self).__init__()
 
-    def get_wiski_record(self):
+    def get_wiski_response(self):
+        """Return response from the Wiski server."""
+        return urllib.request.urlopen(urllib.request.Request(self.url))
+
+    def get_wiski_record(self, source=None):
         """Return data record."""
-        result = urllib.request.urlopen(urllib.request.Request(self.url))
-        doc = minidom.parse(result)
+        doc = minidom.parse(source or self.get_wiski_response())
         return doc.getElementsByTagName("timeseriesValueList")[0].\
             getElementsByTagName("timeseriesvalue")
 
-    def get_data(self, as_dataframe=False):
-        """Return data."""
-        data_records = self.get_wiski_record()
+    def get_data(self, as_dataframe=False, source=None):
+        """Return data.
+
+        The parser is selected through the attribute "parser", either
+        "minidom" (default) or "iterparse" (streaming).
+
+        Args:
+            as_dataframe (bool): False | True
+            source: Optional file-like object to parse instead of the
+                Wiski response, eg. a local copy of a timeseriesValueList.
+        """
+        if self.parser == 'iterparse':
+            return self.get_data_streamed(as_dataframe=as_dataframe, source=source)
+
+        data_records = self.get_wiski_record(source=source)
         data_out = []
         for element in data_records:
             row_data = [
@@ -110,6 +177,28 @@ class Wiski(WiskiBase):
         else:
             return data_out, ['timestamp', self.parameter_name, self.qf_name]
 
+    def get_data_streamed(self, as_dataframe=False, source=None):
+        """Return data parsed from a stream."""
+        timestamps, values, quality = parse_timeseries_stream(
+            source or self.get_wiski_response()
+        )
+        columns = ['timestamp', self.parameter_name, self.qf_name]
+        if as_dataframe:
+            return pd.DataFrame(dict(zip(columns, (timestamps, values, quality))))
+        else:
+            return list(zip(timestamps, values, quality)), columns
+
+    async def aget_data(self, client, as_dataframe=False):
+        """Return data requested through the asynchronous client.
+
+        Args:
+            client (sirena.readers.client.HTTPClient): Pooled http client.
+            as_dataframe (bool): False | True
+        """
+        content = await client.aget(self.url)
+        with Instrumentation.timer('xml_parse'):
+            return self.get_data(as_dataframe=as_dataframe, source=io.BytesIO(content))
+
 
 class WiskiData(Wiski):
     """Preparatory class for data."""
@@ -150,3 +239,15 @@ class WiskiStationRegister:
             print('\nWARNING! Could not load data in {} due to exception: {}\n'
                   ''.format(self.__class__.__name__, e))
         return data
+
+    async def aget_data(self, client):
+        """Return data requested through the asynchronous client."""
+        data = None
+        try:
+            content = await client.aget(self.url)
+            doc = minidom.parse(io.BytesIO(content))
+            data = doc.getElementsByTagName("station")
+        except (requests.exceptions.RequestException, asyncio.TimeoutError,
+                ValueError, ExpatError) as e:
+            ErrorCapturing.append_error(Error=e, Reader=self.__class__.__name__)
+        return data
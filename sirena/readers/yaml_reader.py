@@ -5,10 +5,34 @@ Created on 2020-04-07 10:54
 
 @author: a002028
 """
+import importlib
 import yaml
 from sirena import utils
 
 
+class SirenaLoader(getattr(yaml, 'CSafeLoader', yaml.SafeLoader)):
+    """Safe yaml loader (the C implementation when available).
+
+    Also resolves "!!python/name" tags, but only of sirena objects (eg.
+    readers and writers). The module is imported if needed, since the
+    sirena packages import their modules on first use.
+    """
+
+
+def construct_sirena_name(loader, suffix, node):
+    """Return sirena object named in a "!!python/name:<module>.<name>" tag."""
+    if not suffix.startswith('sirena.'):
+        raise yaml.constructor.ConstructorError(
+            None, None, 'only sirena objects can be named, got {!r}'.format(suffix),
+            node.start_mark
+        )
+    module_name, name = suffix.rsplit('.', 1)
+    return getattr(importlib.import_module(module_name), name)
+
+
+SirenaLoader.add_multi_constructor('tag:yaml.org,2002:python/name:', construct_sirena_name)
+
+
 class YAMLreader(dict):
     """Read yaml files."""
 
@@ -22,7 +46,7 @@ class YAMLreader(dict):
         """
         for config_file in config_files:
             with open(config_file, encoding='utf8') as fd:
-                file = yaml.load(fd, Loader=yaml.FullLoader)
+                file = yaml.load(fd, Loader=SirenaLoader)
                 if file_names_as_key:
                     file_name = utils.get_file_name(config_file)
                     self[file_name] = file
@@ -6,11 +6,19 @@ Created on 2020-04-07 10:28
 @author: a002028
 """
 import os
+import copy
+import asyncio
+import weakref
 import pandas as pd
 from sirena.config import Settings, InfoLog, ErrorCapturing
 from sirena.core.station import MultiStation
 from sirena.core.data_handler import DataFrames
+from sirena.core.alignment import align_channels
 from sirena.core.calculator import Statistics
+from sirena.readers.client import HTTPClient, run
+from sirena.readers.cache import SeriesCache
+from sirena.instrumentation import Instrumentation
+from sirena.utils import get_epoch_milliseconds
 
 
 class Session:
@@ -25,10 +33,17 @@ class Session:
 
         More to come.
         """
-        self.settings = Settings()
+        self.settings = Settings.shared()
         self.stations = MultiStation()
 
         self.readers = self.create_reader_instances(reader=reader)
+        self.workers = self.settings.readers[reader]['reader'].get('workers') or 1
+        self.client = HTTPClient(
+            max_concurrency=self.workers,
+            **self.settings.readers[reader]['reader'].get('client', {})
+        )
+        weakref.finalize(self, self.client.close)
+        self.cache = self.create_cache()
 
         self.create_station_source_connection(station_source)
 
@@ -41,7 +56,7 @@ class Session:
             assert 'stations' in self.readers
             reader = self.readers['stations'].get('reader')
             reader.url = self.settings.server_wiski
-            self.stations.read_from_wiski_elements(reader.get_data())
+            self.stations.read_from_wiski_elements(self.get_with_client(reader))
         elif source == 'samsa':
             reader_spec = self.settings.readers.get('samsa')
             reader = reader_spec.get('reader')()
@@ -49,17 +64,58 @@ class Session:
                 server=self.settings.server_samsa,
                 **reader_spec.get('attributes')
             )
-            self.stations.read_from_samsa_elements(reader.get_data())
+            self.stations.read_from_samsa_elements(
+                self.get_with_client(reader),
+                field_mapping=reader_spec.get('field_mapping'),
+                attribute_mapping=reader_spec.get('attribute_mapping')
+            )
         else:
             raise AssertionError('Station source not recognized ({})'.format(source))
 
         self.update_station_info()
 
+    def create_cache(self):
+        """Return on-disk cache of fetched series, if enabled in settings."""
+        cache_settings = self.settings.settings.get('cache') or {}
+        if not cache_settings.get('enabled'):
+            return None
+        return SeriesCache(
+            directory=self.settings.settings['paths'].get('cache_directory'),
+            ttl=cache_settings.get('ttl'),
+            max_size=cache_settings.get('max_size'),
+        )
+
+    def get_with_client(self, reader):
+        """Return data from reader, requested through the pooled http client."""
+        async def get():
+            async with self.client:
+                return await reader.aget_data(self.client)
+        return run(get())
+
+    def close(self):
+        """Close the http client (pooled connections and threads).
+
+        Also done when the session is garbage collected or used as a
+        context manager:
+
+            with Session(reader='wiski', station_source='wiski') as s:
+                data = s.read(...)
+        """
+        self.client.close()
+
+    def __enter__(self):
+        """Return session."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close session."""
+        self.close()
+
     def update_station_info(self):
         """Update station information."""
         for key, item in self.settings.stations.items():
             if key in self.stations:
-                self.stations[key].update_attributes(**item)
+                self.stations.update_station(key, **item)
 
     def create_reader_instances(self, reader=None):
         """Find readers and return their instances."""
@@ -69,15 +125,25 @@ class Session:
             reader_instances[dataset] = {'reader': self.load_reader(data_type)}
             for key, item in dictionary.items():
                 reader_instances[dataset].setdefault(key, item)
+            reader_instances[dataset].setdefault(
+                'quality_flags', self.settings.readers[reader].get('quality_flags')
+            )
 
         return reader_instances
 
     @staticmethod
     def load_reader(data_type):
-        """Return reader instance."""
-        reader_instance = data_type.get('reader')
-        return reader_instance()
+        """Return reader instance.
 
+        Reader attributes given for the data type (eg. parser) are set on
+        the instance.
+        """
+        reader_instance = data_type.get('reader')()
+        if data_type.get('attributes'):
+            reader_instance.update_attributes(**data_type.get('attributes'))
+        return reader_instance
+
+    @Instrumentation.timed('export')
     def write(self, writer=None, writer_kwargs=None, **kwargs):
         """Write to file.
 
@@ -89,7 +155,7 @@ class Session:
             if key == 'export_filename':
                 writer_kwargs.setdefault('export_path',
                                          os.path.join(self.settings.export_path, item))
-            if 'path' in item:
+            if 'path' in key:
                 item = os.path.join(self.settings.base_directory, item)
             writer_kwargs.setdefault(key, item)
 
@@ -104,19 +170,29 @@ class Session:
         writer_instance.write(data)
 
     def _get_template_data(self, attributes):
-        """Return data to use in template."""
-        data = {}
-        for statn in self.settings.stations['station_list']:
-            try:
-                data[statn] = {a: self.stations[statn].__getattribute__(a) for a in attributes}
-            except Exception:
-                data[statn] = {'template_name': statn}
-        return data
+        """Return data to use in template.
 
-    def read(self, datasets=None, stations=None, all_stations=None, **kwargs):
+        The attribute values are given as set on the stations. Stations
+        without all attributes (None or NaN, unset fields are None) are given
+        by name only.
+        """
+        station_list = self.settings.stations['station_list']
+        found = [statn for statn in station_list if statn in self.stations]
+        frame = self.stations.to_frame(attributes, names=found, numeric=False)
+        records = frame.loc[frame.notna().all(axis=1)].to_dict('index')
+        return {statn: records.get(statn, {'template_name': statn}) for statn in station_list}
+
+    def read(self, datasets=None, stations=None, all_stations=None, workers=None, **kwargs):
         """Read data.
 
         More description to come..
+
+        Args:
+            datasets (list): Datasets to read, see etc/readers/wiski.yaml.
+            stations (list): Stations to read, by name, number or template_number.
+            all_stations (bool): Read all stations in etc/stations.yaml.
+            workers (int): Number of concurrent requests. Defaults to the
+                reader setting "workers".
         """
         selected_datasets = datasets or ['annual_RH2000']
         data_dictionary = {}
@@ -130,12 +206,14 @@ class Session:
             else:
                 raise AssertionError('NO DESIGNATED STATION LIST! {} ?'.format(stations))
 
-            datasets = self._read_datasets(reader_container, station_list)
+            datasets = self._read_datasets(
+                reader_container, station_list, workers=workers or self.workers
+            )
             data_dictionary[dataset_setting] = datasets
 
         return data_dictionary
 
-    def _read_datasets(self, reader_container, station_list):
+    def _read_datasets(self, reader_container, station_list, workers=1):
         """Read data from sources.
 
         start_date = pd.Timestamp('1700-01-01')
@@ -148,6 +226,15 @@ class Session:
                                     'channel': '',
                                     'time_window': (start_date, end_date)})
         df = reader.get_data()
+
+        Every station/channel combination is fetched as a separate request.
+        The requests are sent concurrently (at most "workers" at a time)
+        through the pooled http client, each with its own copy of the reader.
+        Series found in the on-disk cache are not requested.
+
+        The channels of a station are aligned on timestamp in one pass (see
+        align_channels), with the join policy "join" of the dataset
+        ("inner" by default or "outer").
         """
         reader = reader_container.get('reader')
         reader.update_attributes(
@@ -156,46 +243,181 @@ class Session:
             time_window=self.time_window
         )
 
-        dfs = DataFrames()
-        for station in station_list:
-            if not self.stations.get(station):
-                InfoLog.append_missing_station(station)
-                continue
-
-            reader.update_attributes(station=self.stations[station].number)
-
-            df = pd.DataFrame()
+        requests = []
+        selected_stations = []
+        for key in dict.fromkeys(station_list):
+            station = self.stations.resolve(key)
+            if station is None:
+                InfoLog.append_missing_station(key)
+            elif station not in selected_stations:
+                selected_stations.append(station)
+        for station in selected_stations:
             for channel in reader_container.get('channels'):
-                reader.update_attributes(channel=channel)
-                try:
-                    # TODO set timestamp as index?
-                    df_channel = reader.get_data(as_dataframe=True)
-                    if df.empty:
-                        df = df_channel
-                    else:
-                        df = pd.merge(df, df_channel, how='inner', on='timestamp')
-                except BaseException as excep:
-                    ErrorCapturing.append_error(
-                        Error=excep,
-                        Station=station,
-                        Parameter=reader.parameter,
-                        Channel=reader.channel
-                    )
-            if not df.empty:
-                dfs.append_new_frame(
-                    name=station,
-                    data=df,
-                    columns=df.columns
+                requests.append((station, channel))
+
+        results = run(self._aread_channels(
+            reader, requests, workers, incremental=reader_container.get('incremental')
+        ))
+        if self.cache:
+            self.cache.evict()
+
+        channel_frames = {}
+        for (station, channel), (df_channel, excep) in zip(requests, results):
+            channel_frames.setdefault(station, [])
+            if excep is not None:
+                ErrorCapturing.append_error(
+                    Error=excep,
+                    Station=station,
+                    Parameter=reader.parameter,
+                    Channel=channel
                 )
+            else:
+                channel_frames[station].append(df_channel)
+
+        dfs = DataFrames()
+        for station, frames in channel_frames.items():
+            with Instrumentation.timer('merge', station=station):
+                df = align_channels(frames, how=reader_container.get('join') or 'inner')
+            if not df.empty:
+                with Instrumentation.station(station):
+                    dfs.append_new_frame(
+                        name=station,
+                        data=df,
+                        columns=df.columns,
+                        quality_flags=reader_container.get('quality_flags'),
+                        compact=reader_container.get('compact')
+                    )
 
         return dfs
 
-    def get_statistics(self, dataframes, parameter=None, stats_for_year=None):
+    async def _aread_channels(self, reader, requests, workers, incremental=False):
+        """Return results for all (station, channel) requests, in order."""
+        self.client.max_concurrency = workers
+        async with self.client:
+            return await asyncio.gather(*(
+                self._aread_channel(reader, station, channel, incremental=incremental)
+                for station, channel in requests
+            ))
+
+    async def _aread_channel(self, reader, station, channel, incremental=False):
+        """Return data for one station and channel together with a possible error.
+
+        The given reader is copied so that concurrent requests do not share
+        station and channel attributes. Fresh series are taken from the cache
+        and expired ones are used if the request fails (eg. when offline).
+        """
+        reader = copy.copy(reader)
+        reader.update_attributes(
+            station=self.stations[station].number,
+            channel=channel
+        )
+        with Instrumentation.station(station):
+            if self.cache and incremental:
+                return await self._aread_channel_incremental(reader)
+
+            cache_key = None
+            if self.cache:
+                cache_key = self.cache.get_key(reader.server, reader.station, reader.parameter,
+                                               reader.channel, reader.time_window)
+                df = self.cache.get(cache_key)
+                if df is not None:
+                    Instrumentation.count('cache_hits')
+                    return df, None
+            try:
+                # TODO set timestamp as index?
+                df = await reader.aget_data(self.client, as_dataframe=True)
+            except Exception as excep:
+                Instrumentation.count('request_errors')
+                df = self.cache.get(cache_key, ignore_ttl=True) if self.cache else None
+                if df is not None:
+                    return df, None
+                return None, excep
+            if self.cache:
+                self.cache.set(cache_key, df)
+            return df, None
+
+    async def _aread_channel_incremental(self, reader):
+        """Return data for one station and channel, requesting only the tail of the series.
+
+        The stored series is kept per server, station, parameter, channel and
+        start time. It is used as is while younger than the cache ttl and
+        covering the session end time. Otherwise only values from the last
+        stored timestamp and onwards are requested (the last value once more,
+        since the mean of an ongoing period may still change) and merged into
+        the stored series.
+        """
+        key = self.cache.get_key(reader.server, reader.station, reader.parameter,
+                                 reader.channel, self.start_time)
+        stored = self.cache.get(key, ignore_ttl=True)
+        if stored is not None and not self.cache.is_expired(key) and self._covers_end_time(stored):
+            Instrumentation.count('cache_hits')
+            return self._select_time_window(stored), None
+
+        if stored is not None and not stored.empty:
+            last_timestamp = pd.Timestamp(stored['timestamp'].max(), unit='ms')
+            reader.update_attributes(time_window=(last_timestamp, self.end_time))
+        try:
+            df = await reader.aget_data(self.client, as_dataframe=True)
+        except Exception as excep:
+            Instrumentation.count('request_errors')
+            if stored is not None:
+                return self._select_time_window(stored), None
+            return None, excep
+
+        df['timestamp'] = pd.to_numeric(df['timestamp'])
+        if stored is not None:
+            df = pd.concat([stored, df], ignore_index=True)
+            df = df.drop_duplicates('timestamp', keep='last').sort_values('timestamp')
+        self.cache.set(key, df)
+        return self._select_time_window(df), None
+
+    def _covers_end_time(self, df):
+        """Return True if df has values up to the session end time.
+
+        Without end time, any stored series (younger than the ttl) is
+        considered up to date.
+        """
+        if pd.isna(self.end_time):
+            return True
+        return not df.empty and df['timestamp'].max() >= get_epoch_milliseconds(self.end_time)
+
+    def _select_time_window(self, df):
+        """Return the part of df that lies within the session time window."""
+        boolean = pd.Series(True, index=df.index)
+        if not pd.isna(self.start_time):
+            boolean &= df['timestamp'] >= get_epoch_milliseconds(self.start_time)
+        if not pd.isna(self.end_time):
+            boolean &= df['timestamp'] <= get_epoch_milliseconds(self.end_time)
+        return df.loc[boolean].reset_index(drop=True)
+
+    def get_statistics(self, dataframes, parameter=None, stats_for_year=None, batched=False,
+                       lean=False, workers=None):
         """Get statistics.
 
         More description to come..
+
+        Args:
+            dataframes (DataFrames): Data per station.
+            parameter (str): Data column to calculate statistics for.
+            stats_for_year (int): Year of the annual mean water level.
+            batched (bool): Fit the regressions of all stations at once
+                (sirena.core.regression.BatchedOLS).
+            lean (bool): Report-only calculations (eg. for Session.write),
+                see sirena.core.calculator.Calculator.
+            workers (int): Calculate stations in a pool of worker processes.
         """
-        stat_obj = Statistics(calculation_year=stats_for_year)
+        stat_obj = Statistics(calculation_year=stats_for_year, lean=lean)
+
+        stations = {
+            key: {'data': df, 'station_attr': {'ref_value_2000': self.stations[key].ref_value_2000}}
+            for key, df in dataframes.items()
+        }
+        if batched:
+            stat_obj.append_new_stations(stations, parameter=parameter)
+            return stat_obj
+        elif workers and workers > 1:
+            stat_obj.append_new_stations_parallel(stations, parameter=parameter, workers=workers)
+            return stat_obj
 
         for key, df in dataframes.items():
             print(key)
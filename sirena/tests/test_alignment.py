@@ -0,0 +1,37 @@
+# Copyright (c) 2020 SMHI, Swedish Meteorological and Hydrological Institute.
+# License: MIT License (see LICENSE.txt or http://opensource.org/licenses/mit).
+"""
+Created on 2026-10-19 03:30
+
+@author: johannes
+"""
+import numpy as np
+import pandas as pd
+from sirena.core.alignment import align_channels
+
+
+def get_channel(channel, timestamps):
+    """Return channel frame (timestamp, value and flag columns)."""
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        channel: np.arange(len(timestamps), dtype=float),
+        'Q_' + channel: np.full(len(timestamps), 200),
+    })
+
+
+if __name__ == '__main__':
+    first = get_channel('Year.Mean', [0, 1000, 2000, 3000])
+    second = get_channel('Year.Max', [1000, 2000, 4000])
+    empty = get_channel('Year.Min', [])
+
+    # channels without data do not empty the station
+    for frames in ([empty, first, second], [first, empty, second], [pd.DataFrame(), first, second]):
+        for how in ('inner', 'outer'):
+            expected = pd.merge(first, second, how=how, on='timestamp')
+            aligned = align_channels(frames, how=how)
+            assert list(aligned.columns) == list(expected.columns)
+            assert (aligned['timestamp'].values == expected['timestamp'].values).all()
+            np.testing.assert_array_equal(aligned['Year.Max'].values, expected['Year.Max'].values)
+
+    assert align_channels([empty, pd.DataFrame(), None]).empty
+    print('Channels aligned')
@@ -0,0 +1,31 @@
+# Copyright (c) 2020 SMHI, Swedish Meteorological and Hydrological Institute.
+# License: MIT License (see LICENSE.txt or http://opensource.org/licenses/mit).
+"""
+Created on 2026-10-18 21:45
+
+@author: johannes
+"""
+import numpy as np
+import statsmodels.api as sm
+from statsmodels.stats.outliers_influence import summary_table
+from sirena.core.regression import BatchedOLS, pad_arrays
+
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    years = [np.arange(start, 2021) for start in rng.integers(1750, 1990, 20)]
+    values = [-0.4 * (x - 2000) + rng.normal(0, 5, len(x)) for x in years]
+
+    x, mask = pad_arrays(years)
+    y, _ = pad_arrays(values)
+    results = BatchedOLS(x, y, mask=mask, alpha=0.05).get_results()
+
+    for x_station, y_station, batched in zip(years, values, results):
+        res = sm.OLS(y_station, sm.add_constant(x_station.astype(float))).fit()
+        _, data_table, _ = summary_table(res, alpha=0.05)
+        np.testing.assert_allclose(batched['result'].params, res.params, rtol=1e-8)
+        np.testing.assert_allclose(batched['result'].bse, res.bse, rtol=1e-8)
+        for i, key in ((2, 'predstd'), (4, 'ci_l'), (5, 'ci_u'), (6, 'iv_l'), (7, 'iv_u')):
+            np.testing.assert_allclose(batched[key], data_table[:, i], rtol=1e-8)
+
+    print('BatchedOLS matches statsmodels for {} stations'.format(len(results)))
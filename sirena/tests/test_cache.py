@@ -0,0 +1,52 @@
+# Copyright (c) 2020 SMHI, Swedish Meteorological and Hydrological Institute.
+# License: MIT License (see LICENSE.txt or http://opensource.org/licenses/mit).
+"""
+Created on 2026-10-19 04:00
+
+@author: johannes
+"""
+import os
+import time
+import tempfile
+import pandas as pd
+from sirena.config import ErrorCapturing
+from sirena.readers.cache import SeriesCache
+
+
+if __name__ == '__main__':
+    df = pd.DataFrame({'timestamp': [0, 1000, 2000], 'value': [1., 2., 3.]})
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SeriesCache(directory=directory, ttl=60)
+        key = cache.get_key('server', 2507, 'RH2000', 'Year.Mean')
+        assert cache.get(key) is None
+
+        cache.set(key, df)
+        pd.testing.assert_frame_equal(cache.get(key), df)
+        assert [fid for fid in os.listdir(directory)] == [key + cache.suffix]
+
+        # expired entries are only returned when asked for
+        os.utime(cache.get_path(key), (time.time() - 120, time.time() - 120))
+        assert cache.is_expired(key)
+        assert cache.get(key) is None
+        pd.testing.assert_frame_equal(cache.get(key, ignore_ttl=True), df)
+
+        # a truncated entry is a miss and is removed
+        with open(cache.get_path(key), 'r+b') as fd:
+            fd.truncate(10)
+        assert cache.get(key, ignore_ttl=True) is None
+        assert not os.path.exists(cache.get_path(key))
+
+        # a failed write is recorded, not raised
+        ErrorCapturing.reset()
+        cache.set(key, pd.DataFrame({'timestamp': [0], 'value': [object()]}))
+        assert len(ErrorCapturing.errors) == 1
+        assert cache.get(key) is None
+        assert os.listdir(directory) == []
+
+        cache.set(key, df)
+        cache.max_size = 1e-9
+        cache.evict()
+        assert cache.get(key) is None
+
+    print('SeriesCache ok')
@@ -0,0 +1,52 @@
+# Copyright (c) 2020 SMHI, Swedish Meteorological and Hydrological Institute.
+# License: MIT License (see LICENSE.txt or http://opensource.org/licenses/mit).
+"""
+Created on 2026-10-19 04:15
+
+@author: johannes
+
+Incremental reads against the local stand-in server: a later end time
+(eg. the next nightly run) gets the new values, within the cache ttl.
+"""
+import os
+import tempfile
+import pandas as pd
+from sirena.offline.server import StandInServer
+from sirena.readers.cache import SeriesCache
+from sirena.session import Session
+
+
+def read(end_time, cache):
+    """Return last timestamp of the monthly series read up to end_time."""
+    session_obj = Session(
+        reader='wiski',
+        station_source='samsa',
+        start_time='2000-01-01',
+        end_time=end_time,
+    )
+    session_obj.cache = cache
+    with session_obj:
+        dfs = session_obj.read(stations=['RATAN'], datasets=['monthly_RH2000'])
+    return dfs['monthly_RH2000']['RATAN']['timestamp'].max()
+
+
+if __name__ == '__main__':
+    with StandInServer() as server, tempfile.TemporaryDirectory() as directory:
+        server_info_path = os.path.join(directory, 'srv.json')
+        server.write_server_info(server_info_path)
+        os.environ['SIRENA_SERVER_INFO_PATH'] = server_info_path
+        cache = SeriesCache(directory=os.path.join(directory, 'cache'), ttl=86400)
+
+        assert read('2020-03-01', cache) == pd.Timestamp('2020-03-01')
+        requests = server.counts['requests']
+
+        # same end time, taken from the cache (only the station register is requested)
+        assert read('2020-03-01', cache) == pd.Timestamp('2020-03-01')
+        register_requests = server.counts['requests'] - requests
+        requests = server.counts['requests']
+
+        # later end time, the tail is requested
+        assert read('2020-06-01', cache) == pd.Timestamp('2020-06-01')
+        assert server.counts['requests'] - requests == register_requests + 3
+
+    print('New values read incrementally')
@@ -0,0 +1,48 @@
+# Copyright (c) 2020 SMHI, Swedish Meteorological and Hydrological Institute.
+# License: MIT License (see LICENSE.txt or http://opensource.org/licenses/mit).
+"""
+Created on 2026-10-18 23:55
+
+@author: johannes
+
+Load test of the readers against the local stand-in server.
+"""
+import os
+import time
+import tempfile
+from sirena.config import ErrorCapturing
+from sirena.instrumentation import Instrumentation
+from sirena.offline.server import StandInServer
+from sirena.session import Session
+
+
+if __name__ == '__main__':
+    with StandInServer(latency=0.05, jitter=0.05, error_rate=0.05) as server, \
+            tempfile.TemporaryDirectory() as directory:
+        server_info_path = os.path.join(directory, 'srv.json')
+        server.write_server_info(server_info_path)
+        os.environ['SIRENA_SERVER_INFO_PATH'] = server_info_path
+
+        session_obj = Session(
+            reader='wiski',
+            station_source='samsa',
+            start_time='1700-01-01',
+            end_time='2020-12-31',
+        )
+        # measure the requests, not the on-disk cache
+        session_obj.cache = None
+
+        for workers in (1, 8):
+            Instrumentation.reset()
+            start_time = time.time()
+            dfs = session_obj.read(
+                all_stations=True,
+                datasets=['annual_RH2000'],
+                workers=workers,
+            )
+            print('workers: {}, stations: {}, time: {:.3f} sec'.format(
+                workers, len(dfs['annual_RH2000']), time.time() - start_time))
+            print(Instrumentation.report_text())
+
+        print('Server counts: {}'.format(server.counts))
+        print('Errors captured: {}'.format(len(ErrorCapturing.errors)))
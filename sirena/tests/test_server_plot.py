@@ -0,0 +1,75 @@
+# Copyright (c) 2020 SMHI, Swedish Meteorological and Hydrological Institute.
+# License: MIT License (see LICENSE.txt or http://opensource.org/licenses/mit).
+"""
+Created on 2026-10-19 01:50
+
+@author: johannes
+
+Server mode of the GUI, without starting a server. Run with "--serve" to
+serve the GUI on http://localhost:5006/ (stop with Ctrl+C).
+"""
+import sys
+import numpy as np
+from bokeh.document import Document
+from sirena.core.calculator import Statistics
+from sirena.core.station import MultiStation
+from sirena.offline.fixtures import get_dataframes, get_samsa_data
+from sirena.plotting.server import ServerPlot, get_application, serve
+
+
+if __name__ == '__main__':
+    nr_stations = 20
+    stations = MultiStation()
+    stations.read_from_samsa_elements(get_samsa_data(nr_stations)['data'])
+    dfs = get_dataframes(nr_stations, 300)
+
+    stats = Statistics()
+    for name, station in stations.items():
+        station.update_attributes(absolute_landlift=5., k_value=0.4)
+        stats.append_new_station(
+            name=name,
+            data=dfs[name],
+            parameter='RH2000_Year.Mean',
+            station_attr={'ref_value_2000': station.ref_value_2000}
+        )
+
+    if '--serve' in sys.argv:
+        serve(stations=stations, statistics=stats)
+        sys.exit()
+
+    # one document per browser session
+    assert get_application(stations=stations, statistics=stats).create_document().roots
+
+    doc = Document()
+    plot = ServerPlot(stations=stations, statistics=stats)
+    plot.show_plot(doc)
+
+    plot.position_source.selected.indices = [3]
+    name = plot.selected_station
+    assert name == plot.position_source.data['STATN'][3]
+    assert len(plot.plot_source.data['year']) == len(stats[name].year)
+
+    # regression test line from the slider year, over all years of the station
+    item = stats[name]
+    for start_year in (plot.slider.start, 1980):
+        plot.slider.value = start_year
+        plot.on_slider_change('value_throttled', None, start_year)
+        boolean = (item.year >= start_year) & item.data_values.notna()
+        slope, intercept = np.polyfit(item.year[boolean].astype(float), item.data_values[boolean], 1)
+        years = [item.year.iloc[0], item.year.iloc[-1]]
+        assert list(plot.regression_source.data['year']) == years
+        np.testing.assert_allclose(plot.regression_source.data['additional_regression'],
+                                   [intercept + slope * year for year in years], rtol=1e-6)
+
+    plot.save_station_attribute('ref_value_2000', '12.5')
+    assert stations[name].ref_value_2000 == 12.5
+    assert plot.position_source.data['ref_value_2000'][3] == 12.5
+
+    # not a number, neither the station nor the map source is changed
+    plot.save_station_attribute('k_value', 'abc')
+    assert stations[name].k_value == 0.4
+    assert plot.position_source.data['k_value'][3] == 0.4
+
+    plot.save_station_attribute('equation', 'y = 0.4x + 12.5')
+    assert stations[name].equation == 'y = 0.4x + 12.5'
+    print('Saved attributes of {}: {}'.format(name, stations[name]))
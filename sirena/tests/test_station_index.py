@@ -0,0 +1,54 @@
+# Copyright (c) 2020 SMHI, Swedish Meteorological and Hydrological Institute.
+# License: MIT License (see LICENSE.txt or http://opensource.org/licenses/mit).
+"""
+Created on 2026-10-19 04:30
+
+@author: johannes
+
+Lookup of stations by number, template_number and position.
+"""
+from sirena.core.station import MultiStation, Station
+
+
+if __name__ == '__main__':
+    stations = MultiStation()
+    stations.append_new_station(name='Kungsvik', number=2130, template_number='2130/33073',
+                                latitude=58.996667, longitude=11.127222)
+    stations.append_new_station(name='Smögen', number=2125, template_number='2125/33071',
+                                latitude=58.353611, longitude=11.217778)
+    stations.append_new_station(name='Stockholm', number=2069, template_number='2069/33057',
+                                latitude=59.324167, longitude=18.081667)
+    # no position, not in the spatial index
+    stations.append_new_station(name='Ratan', number=2056, latitude=float('nan'), longitude=20.895)
+
+    assert stations.resolve('kungsvik') == 'KUNGSVIK'
+    assert stations.resolve(2125) == 'SMÖGEN'
+    assert stations.resolve('33057') == 'STOCKHOLM'
+    assert stations.resolve('2069/33057') == 'STOCKHOLM'
+    assert stations.resolve(9999) is None
+
+    nearest = stations.get_nearest(58.9, 11.1, k=2)
+    assert [name for name, _ in nearest] == ['KUNGSVIK', 'SMÖGEN']
+    assert 10 < nearest[0][1] < 12
+    assert [name for name, _ in stations.get_within_radius(58.9, 11.1, 100)] == ['KUNGSVIK', 'SMÖGEN']
+    assert len(stations.get_nearest(58.9, 11.1, k=10)) == 3
+
+    # changed number and position
+    stations.update_station('SMÖGEN', number=2126, latitude=59.3, longitude=18.)
+    assert stations.get_name_by_number(2125) is None
+    assert stations.resolve(2126) == 'SMÖGEN'
+    assert stations.get_nearest(59.3, 18.)[0][0] == 'SMÖGEN'
+    assert [name for name, _ in stations.get_within_radius(58.9, 11.1, 100)] == ['KUNGSVIK']
+
+    # removed and replaced stations
+    del stations['KUNGSVIK']
+    assert stations.resolve(2130) is None
+    assert stations.resolve('33073') is None
+    assert stations.get_within_radius(58.9, 11.1, 100) == []
+    stations.pop('STOCKHOLM')
+    assert stations.resolve(2069) is None
+    stations['GÖTEBORG'] = Station(name='GÖTEBORG', number=2111, latitude=57.685, longitude=11.944)
+    assert stations.resolve(2111) == 'GÖTEBORG'
+    assert stations.get_nearest(57.7, 11.9)[0][0] == 'GÖTEBORG'
+
+    print('Station indexes ok')
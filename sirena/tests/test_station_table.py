@@ -0,0 +1,45 @@
+# Copyright (c) 2020 SMHI, Swedish Meteorological and Hydrological Institute.
+# License: MIT License (see LICENSE.txt or http://opensource.org/licenses/mit).
+"""
+Created on 2026-10-19 03:45
+
+@author: johannes
+
+Stations from SAMSA records that do not all have the same fields.
+"""
+from sirena.core.station import MultiStation
+
+
+if __name__ == '__main__':
+    records = [
+        {
+            'stationName': 'KUNGSVIK', 'stationIdentity': 2507, 'ownerName': None,
+            'wgs84Latitude': '58.996667', 'wgs84Longitude': 11.127222,
+            'attributes': [{'attributeKey': 'referensvarde', 'attributeValue': '0.4'}],
+        },
+        # without stationIdentity, coordinates and attributes
+        {'stationName': 'RATAN', 'ownerName': 'SMHI'},
+        {
+            'stationName': 'STOCKHOLM', 'stationIdentity': 2069,
+            'attributes': [{'attributeKey': 'referensvarde', 'attributeValue': 'saknas'}],
+        },
+        {'stationName': None, 'stationIdentity': 1},
+    ]
+    stations = MultiStation()
+    stations.read_from_samsa_elements(records)
+
+    assert list(stations) == ['KUNGSVIK', 'RATAN', 'STOCKHOLM']
+    assert stations['KUNGSVIK'].number == '2507'
+    assert stations.resolve(2507) == 'KUNGSVIK'
+    assert stations.resolve('2069') == 'STOCKHOLM'
+    assert stations['KUNGSVIK'].latitude == 58.996667
+    assert stations['KUNGSVIK'].ref_value_2000 == 0.4
+
+    # explicit None is set, missing fields are left unset
+    assert 'ownerName' in stations['KUNGSVIK'].extras
+    assert stations['KUNGSVIK'].ownerName is None
+    assert stations['RATAN'].ownerName == 'SMHI'
+    assert 'ownerName' not in stations['STOCKHOLM'].extras
+    assert stations['RATAN'].number is None
+    assert stations['STOCKHOLM'].ref_value_2000 is None
+    print('Stations read from {} records'.format(len(records)))
@@ -10,6 +10,7 @@ import numpy as np
 from collections import Mapping
 from datetime import datetime
 import shutil
+from functools import lru_cache
 from decimal import Decimal, ROUND_HALF_UP
 
 
@@ -19,6 +20,21 @@ def check_path(path):
         os.makedirs(path)
 
 
+def convert_projection(lats, lons):
+    """Transform coordinates from WGS84 (EPSG:4326) to the Google projection (EPSG:3857).
+
+    Args:
+        lats: Latitudes, scalar or array like.
+        lons: Longitudes, scalar or array like.
+
+    Returns:
+        x, y as numpy arrays (float64).
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    return get_transformer(4326, 3857).transform(lons, lats)
+
+
 def convert_string_to_datetime_obj(x, fmt):
     """Return datetime object.
 
@@ -162,6 +178,13 @@ def get_datetime_now(fmt='%Y-%m-%d %H:%M:%S'):
     return datetime.now().strftime(fmt)
 
 
+def get_epoch_milliseconds(timestamp):
+    """Return milliseconds since 1970-01-01 (negative before) for timestamp."""
+    import pandas as pd
+    delta = pd.Timestamp(timestamp) - pd.Timestamp('1970-01-01')
+    return delta // pd.Timedelta(milliseconds=1)
+
+
 def get_export_folder():
     """Return path to export folder."""
     date_str = get_datetime_now(fmt='%Y%m%d')
@@ -171,6 +194,13 @@ def get_export_folder():
     return export_path
 
 
+@lru_cache(maxsize=None)
+def get_transformer(from_crs, to_crs):
+    """Return pyproj Transformer (always_xy), created once per pair of CRS."""
+    from pyproj import Transformer
+    return Transformer.from_crs(from_crs, to_crs, always_xy=True)
+
+
 def get_file_list_based_on_suffix(file_list, suffix):
     """Get filenames ending with "suffix"."""
     match_list = []
@@ -5,5 +5,22 @@ Created on 2020-04-07 10:33
 
 @author: a002028
 """
-from sirena.writers.writer import WriterBase  # noqa: F401
-from sirena.writers.excel_template import ExcelTemplateWriter  # noqa: F401
+import importlib
+
+# writers are imported on first use
+_lazy_attributes = {
+    'WriterBase': 'sirena.writers.writer',
+    'ExcelTemplateWriter': 'sirena.writers.excel_template',
+}
+
+
+def __getattr__(name):
+    """Import writer on first use."""
+    if name in _lazy_attributes:
+        return getattr(importlib.import_module(_lazy_attributes[name]), name)
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+def __dir__():
+    """Return attributes, including writers not imported yet."""
+    return sorted(list(globals()) + list(_lazy_attributes))
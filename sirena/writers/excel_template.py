@@ -6,8 +6,6 @@ Created on 2021-03-29 13:20
 @author: johannes
 """
 import shutil
-import openpyxl
-from openpyxl import load_workbook
 from sirena.writers.writer import WriterBase
 
 
@@ -41,7 +39,8 @@ class ExcelTemplateWriter(WriterBase):
                 row_number = 60
 
         if hasattr(self, 'img_path'):
-            img = openpyxl.drawing.image.Image(self.img_path)
+            from openpyxl.drawing.image import Image
+            img = Image(self.img_path)
             img.anchor = 'B2'
             ws.add_image(img)
 
@@ -50,6 +49,7 @@ class ExcelTemplateWriter(WriterBase):
 
     def copy_new_workbook(self):
         """Copy template workbook."""
+        from openpyxl import load_workbook
         shutil.copyfile(self.workbook_template_path, self.export_path)
         self.workbook = load_workbook(self.export_path)
 